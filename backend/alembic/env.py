@@ -5,7 +5,8 @@ from sqlalchemy import pool
 from alembic import context
 
 # Import all models here
-from app.models.inventory import MaterialStock
+from app.models.inventory import MaterialStock, StockHistory, StockDailySnapshot, StockAlert
+from app.models.forecast import TrainingJob, ForecastModel, StoredForecastPoint
 from app.db.base import Base
 from app.core.config import settings
 
@@ -0,0 +1,52 @@
+"""add_reorder_points_and_stock_alerts
+
+Revision ID: 0a3c5e7b9d41
+Revises: f7d0b3e5a249
+Create Date: 2026-10-17 18:04:52.731640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a3c5e7b9d41'
+down_revision: Union[str, None] = 'f7d0b3e5a249'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('material_stocks', sa.Column('reorder_point', sa.Float(), nullable=True))
+    op.create_index('ix_material_stocks_available', 'material_stocks', ['available'], unique=False)
+    op.create_index('ix_material_stocks_below_reorder', 'material_stocks', ['material_id'], unique=False,
+                    postgresql_where=sa.text('available <= reorder_point'),
+                    sqlite_where=sa.text('available <= reorder_point'))
+
+    op.create_table('stock_alerts',
+    sa.Column('material_id', sa.String(), nullable=False),
+    sa.Column('alert_type', sa.String(), nullable=False),
+    sa.Column('threshold', sa.Float(), nullable=False),
+    sa.Column('current_level', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['material_stocks.material_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('material_id')
+    )
+    op.create_index('ix_stock_alerts_created_at', 'stock_alerts', ['created_at'], unique=False)
+
+    # Henüz yeniden sipariş noktası yok; yalnızca tükenmiş stoklar uyarı alır
+    op.execute(
+        "INSERT INTO stock_alerts (material_id, alert_type, threshold, current_level) "
+        "SELECT material_id, 'out_of_stock', 0, available FROM material_stocks WHERE available <= 0"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_alerts_created_at', table_name='stock_alerts')
+    op.drop_table('stock_alerts')
+    op.drop_index('ix_material_stocks_below_reorder', table_name='material_stocks')
+    op.drop_index('ix_material_stocks_available', table_name='material_stocks')
+    op.drop_column('material_stocks', 'reorder_point')
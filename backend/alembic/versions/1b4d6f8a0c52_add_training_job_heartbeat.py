@@ -0,0 +1,28 @@
+"""add_training_job_heartbeat
+
+Revision ID: 1b4d6f8a0c52
+Revises: 0a3c5e7b9d41
+Create Date: 2026-10-17 19:42:13.508217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b4d6f8a0c52'
+down_revision: Union[str, None] = '0a3c5e7b9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('training_jobs', sa.Column('worker_id', sa.String(), nullable=True))
+    op.add_column('training_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('training_jobs', 'heartbeat_at')
+    op.drop_column('training_jobs', 'worker_id')
@@ -0,0 +1,46 @@
+"""add_forecast_model_latest_unique_index
+
+Revision ID: 2c5e7a9b1d63
+Revises: 1b4d6f8a0c52
+Create Date: 2026-10-17 21:08:47.612094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c5e7a9b1d63'
+down_revision: Union[str, None] = '1b4d6f8a0c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Eşzamanlı kayıtlardan kalmış olabilecek çift latest satırlarında en yenisi tutulur
+    forecast_models = sa.table(
+        'forecast_models',
+        sa.column('id', sa.Integer),
+        sa.column('material_id', sa.String),
+        sa.column('is_latest', sa.Boolean)
+    )
+    newest = sa.select(sa.func.max(forecast_models.c.id)).where(
+        forecast_models.c.is_latest.is_(True)
+    ).group_by(forecast_models.c.material_id)
+    op.execute(
+        forecast_models.update()
+        .where(forecast_models.c.is_latest.is_(True), forecast_models.c.id.not_in(newest))
+        .values(is_latest=False)
+    )
+    op.create_index(
+        'uq_forecast_models_latest_material', 'forecast_models', ['material_id'],
+        unique=True,
+        postgresql_where=sa.text('is_latest'),
+        sqlite_where=sa.text('is_latest')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_forecast_models_latest_material', table_name='forecast_models')
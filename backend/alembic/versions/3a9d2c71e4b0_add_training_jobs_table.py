@@ -0,0 +1,44 @@
+"""add_training_jobs_table
+
+Revision ID: 3a9d2c71e4b0
+Revises: dde7e82c47d9
+Create Date: 2026-10-17 10:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d2c71e4b0'
+down_revision: Union[str, None] = 'dde7e82c47d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('training_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('job_type', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.Column('completed_items', sa.Integer(), nullable=True),
+    sa.Column('total_items', sa.Integer(), nullable=True),
+    sa.Column('params', sa.JSON(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_training_jobs_id'), 'training_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_training_jobs_status'), 'training_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_training_jobs_status'), table_name='training_jobs')
+    op.drop_index(op.f('ix_training_jobs_id'), table_name='training_jobs')
+    op.drop_table('training_jobs')
@@ -0,0 +1,46 @@
+"""add_forecast_models_table
+
+Revision ID: 5c1e8f0a9d27
+Revises: 3a9d2c71e4b0
+Create Date: 2026-10-17 11:02:47.530116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8f0a9d27'
+down_revision: Union[str, None] = '3a9d2c71e4b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('forecast_models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('material_id', sa.String(), nullable=False),
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('model_type', sa.String(), nullable=False),
+    sa.Column('model_path', sa.String(), nullable=True),
+    sa.Column('metrics', sa.JSON(), nullable=True),
+    sa.Column('validation_metrics', sa.JSON(), nullable=True),
+    sa.Column('training_size', sa.Integer(), nullable=True),
+    sa.Column('is_latest', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_forecast_models_id'), 'forecast_models', ['id'], unique=False)
+    op.create_index(op.f('ix_forecast_models_material_id'), 'forecast_models', ['material_id'], unique=False)
+    op.create_index('ix_forecast_models_material_id_version', 'forecast_models', ['material_id', 'version'], unique=True)
+    op.create_index('ix_forecast_models_is_latest', 'forecast_models', ['is_latest', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_forecast_models_is_latest', table_name='forecast_models')
+    op.drop_index('ix_forecast_models_material_id_version', table_name='forecast_models')
+    op.drop_index(op.f('ix_forecast_models_material_id'), table_name='forecast_models')
+    op.drop_index(op.f('ix_forecast_models_id'), table_name='forecast_models')
+    op.drop_table('forecast_models')
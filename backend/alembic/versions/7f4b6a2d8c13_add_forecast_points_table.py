@@ -0,0 +1,34 @@
+"""add_forecast_points_table
+
+Revision ID: 7f4b6a2d8c13
+Revises: 5c1e8f0a9d27
+Create Date: 2026-10-17 11:48:19.604372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f4b6a2d8c13'
+down_revision: Union[str, None] = '5c1e8f0a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('forecast_points',
+    sa.Column('material_id', sa.String(), nullable=False),
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('ds', sa.DateTime(), nullable=False),
+    sa.Column('yhat', sa.Float(), nullable=False),
+    sa.Column('yhat_lower', sa.Float(), nullable=True),
+    sa.Column('yhat_upper', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('material_id', 'version', 'ds')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('forecast_points')
@@ -0,0 +1,26 @@
+"""add_forecast_model_data_hash
+
+Revision ID: 9b2e4d6f1a35
+Revises: 7f4b6a2d8c13
+Create Date: 2026-10-17 12:21:33.872041
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4d6f1a35'
+down_revision: Union[str, None] = '7f4b6a2d8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('forecast_models', sa.Column('data_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('forecast_models', 'data_hash')
@@ -0,0 +1,43 @@
+"""add_material_search_indexes
+
+Revision ID: c4a7e9b2d016
+Revises: 9b2e4d6f1a35
+Create Date: 2026-10-17 15:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e9b2d016'
+down_revision: Union[str, None] = '9b2e4d6f1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_trgm yalnızca PostgreSQL'de var; diğer veritabanları bellek içi indeksi kullanır
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX ix_material_stocks_material_id_trgm '
+        'ON material_stocks USING gin (material_id gin_trgm_ops)')
+    op.execute(
+        'CREATE INDEX ix_material_stocks_description_trgm '
+        'ON material_stocks USING gin (material_description gin_trgm_ops)')
+    # Kısa terimlerde lower(material_id) LIKE 'abc%' önek araması için
+    op.execute(
+        'CREATE INDEX ix_material_stocks_material_id_prefix '
+        'ON material_stocks (lower(material_id) text_pattern_ops)')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_material_stocks_material_id_prefix', table_name='material_stocks')
+    op.drop_index('ix_material_stocks_description_trgm', table_name='material_stocks')
+    op.drop_index('ix_material_stocks_material_id_trgm', table_name='material_stocks')
@@ -0,0 +1,35 @@
+"""add_stock_daily_snapshots_table
+
+Revision ID: d5b8f1c3e027
+Revises: c4a7e9b2d016
+Create Date: 2026-10-17 15:48:37.206514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8f1c3e027'
+down_revision: Union[str, None] = 'c4a7e9b2d016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_daily_snapshots',
+    sa.Column('material_id', sa.String(), nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('reserved', sa.Float(), nullable=False),
+    sa.Column('available', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['material_stocks.material_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('material_id', 'snapshot_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stock_daily_snapshots')
@@ -0,0 +1,30 @@
+"""add_stock_history_keyset_index
+
+Revision ID: e6c9a2d4f138
+Revises: d5b8f1c3e027
+Create Date: 2026-10-17 16:31:05.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c9a2d4f138'
+down_revision: Union[str, None] = 'd5b8f1c3e027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stock_history_material_created_id', 'stock_history',
+                    ['material_id', 'created_at', 'id'], unique=False)
+    # Bileşik indeksin ön eki olduğundan gereksiz
+    op.drop_index('ix_stock_history_material_id', table_name='stock_history')
+
+
+def downgrade() -> None:
+    op.create_index('ix_stock_history_material_id', 'stock_history', ['material_id'], unique=False)
+    op.drop_index('ix_stock_history_material_created_id', table_name='stock_history')
@@ -0,0 +1,129 @@
+"""partition_stock_history_by_month
+
+Revision ID: f7d0b3e5a249
+Revises: e6c9a2d4f138
+Create Date: 2026-10-17 17:12:44.093817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d0b3e5a249'
+down_revision: Union[str, None] = 'e6c9a2d4f138'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Ayın bölümü yoksa oluşturur. Varsayılan bölüme düşmüş o aya ait satırlar
+# önce yeni tabloya taşınır; aksi halde ATTACH PARTITION reddedilir.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_stock_history_partition(month_start date) RETURNS text AS $$
+DECLARE
+    lower_bound timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+    upper_bound timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+    partition_name text := 'stock_history_' || to_char(month_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE stock_history INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM stock_history_default '
+        'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, partition_name);
+    EXECUTE format(
+        'ALTER TABLE stock_history ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COLUMNS = ("id, material_id, quantity_change, is_reserved, previous_quantity, "
+           "new_quantity, notes, created_at")
+
+
+def upgrade() -> None:
+    # Bildirimsel bölümleme yalnızca PostgreSQL'de; diğer veritabanlarında tablo olduğu gibi kalır
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE stock_history RENAME TO stock_history_legacy')
+    op.execute('ALTER TABLE stock_history_legacy RENAME CONSTRAINT stock_history_pkey TO stock_history_legacy_pkey')
+    op.execute('ALTER INDEX ix_stock_history_id RENAME TO ix_stock_history_legacy_id')
+    op.execute('ALTER INDEX ix_stock_history_material_created_id RENAME TO ix_stock_history_legacy_material_created_id')
+
+    # Bölüm anahtarı birincil anahtarda yer almak zorunda: (id, created_at)
+    op.execute("""
+        CREATE TABLE stock_history (
+            id integer NOT NULL DEFAULT nextval('stock_history_id_seq'),
+            material_id varchar REFERENCES material_stocks (material_id),
+            quantity_change double precision,
+            is_reserved boolean,
+            previous_quantity double precision,
+            new_quantity double precision,
+            notes varchar,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('ALTER SEQUENCE stock_history_id_seq OWNED BY stock_history.id')
+    op.execute('CREATE TABLE stock_history_default PARTITION OF stock_history DEFAULT')
+    op.create_index('ix_stock_history_id', 'stock_history', ['id'], unique=False)
+    op.create_index('ix_stock_history_material_created_id', 'stock_history',
+                    ['material_id', 'created_at', 'id'], unique=False)
+
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    # Mevcut verinin ilk ayından itibaren, iki ay ilerisine kadar bölümler
+    op.execute("""
+        SELECT ensure_stock_history_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM stock_history_legacy), now()) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '2 months',
+            interval '1 month'
+        ) AS month
+    """)
+    op.execute(f"""
+        INSERT INTO stock_history ({COLUMNS})
+        SELECT id, material_id, quantity_change, is_reserved, previous_quantity,
+               new_quantity, notes, coalesce(created_at, now())
+        FROM stock_history_legacy
+    """)
+    op.execute('DROP TABLE stock_history_legacy')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE stock_history RENAME TO stock_history_partitioned')
+    op.execute('ALTER INDEX ix_stock_history_id RENAME TO ix_stock_history_partitioned_id')
+    op.execute('ALTER INDEX ix_stock_history_material_created_id RENAME TO ix_stock_history_partitioned_material_created_id')
+    op.execute('ALTER TABLE stock_history_partitioned RENAME CONSTRAINT stock_history_pkey TO stock_history_partitioned_pkey')
+
+    op.execute("""
+        CREATE TABLE stock_history (
+            id integer NOT NULL DEFAULT nextval('stock_history_id_seq'),
+            material_id varchar REFERENCES material_stocks (material_id),
+            quantity_change double precision,
+            is_reserved boolean,
+            previous_quantity double precision,
+            new_quantity double precision,
+            notes varchar,
+            created_at timestamptz DEFAULT now(),
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute('ALTER SEQUENCE stock_history_id_seq OWNED BY stock_history.id')
+    op.execute(f'INSERT INTO stock_history ({COLUMNS}) SELECT {COLUMNS} FROM stock_history_partitioned')
+    op.execute('DROP TABLE stock_history_partitioned CASCADE')
+    op.execute('DROP FUNCTION IF EXISTS ensure_stock_history_partition(date)')
+    op.create_index('ix_stock_history_id', 'stock_history', ['id'], unique=False)
+    op.create_index('ix_stock_history_material_created_id', 'stock_history',
+                    ['material_id', 'created_at', 'id'], unique=False)
@@ -1,17 +1,33 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.db.session import get_db
-from app.services.inventory import InventoryService
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional, List
+from app.db.session import get_async_db
+from app.services.inventory import AsyncInventoryService
+from app.services.inventory_cache import inventory_cache
+from app.services.inventory_events import inventory_events, stream_inventory_events
+from app.services.inventory_import import InventoryBulkImporter, iter_upload_records
+from app.services.inventory_export import (
+    export_stocks, export_stock_history, MEDIA_TYPES
+)
+from app.services.inventory_rows import (
+    InventoryRowService, iter_low_stock_ndjson, rows_to_records, dumps, dumps_ndjson,
+    NDJSON_MEDIA_TYPE
+)
 from app.models.inventory import (
     MaterialStockCreate,
     MaterialStockUpdate,
     MaterialStockRead,
     MaterialStockReadList,
     StockTrendResponse,
-    StockHistoryResponse
+    StockHistoryResponse,
+    StockAdjustmentBulkRequest,
+    StockAdjustmentBulkResponse,
+    BulkImportResponse,
+    ReorderPointForecastResponse
 )
+from app.schemas.inventory import InventoryAlert
 
 router = APIRouter()
 
@@ -21,48 +37,136 @@ async def list_material_stocks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; overrides skip"),
+    count: Literal["exact", "estimate", "none"] = Query("exact"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.read_material_stocks(skip, limit, search, cursor, count)
+
+
+@router.get("/rows")
+async def list_material_stock_rows(
+    limit: int = Query(100, ge=1, le=1000),
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    GET /inventory ile aynı alanlar, hafif yol: sütun sorgusu + orjson.
+    Toplam sayı dönmez; ndjson biçiminde imleç X-Next-Cursor başlığındadır.
+    """
+    rows, next_cursor = await InventoryRowService(db).list_stock_rows(limit, search, cursor)
+    if format == "ndjson":
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(dumps_ndjson(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return Response(
+        dumps({"items": rows_to_records(rows), "next_cursor": next_cursor}),
+        media_type="application/json")
+
+
+@router.get("/cache/stats")
+async def get_inventory_cache_stats():
+    return inventory_cache.stats()
+
+
+@router.get("/events/stream")
+async def stream_inventory_changes(
+    request: Request,
+    material_id: Optional[List[str]] = Query(None, description="Subscribe to these materials only"),
 ):
-    inventory_service = InventoryService(db)
-    items, total = inventory_service.list_material_stocks(skip, limit, search)
-    return MaterialStockReadList(items=items, total=total)
+    return StreamingResponse(
+        stream_inventory_events(request, material_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/events/stats")
+async def get_inventory_event_stats():
+    return inventory_events.stats()
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Saat dilimi verilmemiş zamanlar UTC kabul edilir"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _export_response(body, export_format: str, name: str) -> StreamingResponse:
+    filename = f"{name}_{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export/stocks")
+async def export_material_stocks(
+    format: Literal["csv", "ndjson", "parquet"] = Query("csv")
+):
+    """material_stocks tablosunun tamamını sabit bellekle akıtır"""
+    return _export_response(export_stocks(format), format, "material_stocks")
+
+
+@router.get("/export/history")
+async def export_stock_movements(
+    start_date: datetime = Query(..., description="Inclusive lower bound on created_at"),
+    end_date: Optional[datetime] = Query(None, description="Exclusive upper bound; defaults to now"),
+    material_id: Optional[str] = Query(None),
+    format: Literal["csv", "ndjson", "parquet"] = Query("csv")
+):
+    """Dönem içindeki stok hareketlerini sabit bellekle akıtır"""
+    start_date = _as_utc(start_date)
+    end_date = _as_utc(end_date) if end_date else datetime.now(timezone.utc)
+    # Akış başladıktan sonra durum kodu değiştirilemez; doğrulama burada yapılır
+    if start_date >= end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be before end_date"
+        )
+    return _export_response(
+        export_stock_history(format, start_date, end_date, material_id), format, "stock_history")
 
 
 @router.get("/{material_id}", response_model=MaterialStockRead)
 async def get_material_stock(
     material_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    return inventory_service.get_material_stock(material_id)
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.read_material_stock(material_id)
 
 
 @router.post("/", response_model=MaterialStockRead, status_code=status.HTTP_201_CREATED)
 async def create_material_stock(
     material_stock: MaterialStockCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    return inventory_service.create_material_stock(material_stock)
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.create_material_stock(material_stock)
 
 
 @router.put("/{material_id}", response_model=MaterialStockRead)
 async def update_material_stock(
     material_id: str,
     material_stock: MaterialStockUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    return inventory_service.update_material_stock(material_id, material_stock)
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.update_material_stock(material_id, material_stock)
 
 
 @router.delete("/{material_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_material_stock(
     material_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    inventory_service.delete_material_stock(material_id)
+    inventory_service = AsyncInventoryService(db)
+    await inventory_service.delete_material_stock(material_id)
 
 
 @router.post("/{material_id}/adjust", response_model=MaterialStockRead)
@@ -71,57 +175,114 @@ async def adjust_stock(
     quantity_change: float = Query(...),
     is_reserved: bool = Query(False),
     notes: str = Query(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
+):
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.adjust_stock(material_id, quantity_change, is_reserved, notes)
+
+
+@router.post("/adjust/bulk", response_model=StockAdjustmentBulkResponse)
+async def bulk_adjust_stock(
+    request: StockAdjustmentBulkRequest,
+    atomic: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    return inventory_service.adjust_stock(material_id, quantity_change, is_reserved, notes)
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.bulk_adjust_stock(request.items, atomic)
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_upsert_material_stocks(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    JSON dizi, NDJSON ya da CSV gövdesiyle malzeme stoklarını toplu ekler/günceller.
+    NDJSON ve CSV akış olarak okunur; hatalı satırlar atlanıp raporlanır.
+    """
+    importer = InventoryBulkImporter(db)
+    return await importer.import_records(iter_upload_records(request))
 
 
 @router.get("/low-stock/list", response_model=List[MaterialStockRead])
 async def get_low_stock_materials(
-    threshold: float = Query(10.0, ge=0),
-    db: Session = Depends(get_db)
+    threshold: float = Query(10.0, ge=0, description="Global available-quantity threshold"),
+    reorder_points: bool = Query(
+        False, description="Use per-material reorder points (open alerts) instead of threshold"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.get_low_stock_materials(None if reorder_points else threshold)
+
+
+@router.get("/low-stock/rows")
+async def get_low_stock_material_rows(
+    threshold: float = Query(10.0, ge=0, description="Global available-quantity threshold"),
+    reorder_points: bool = Query(
+        False, description="Use per-material reorder points (open alerts) instead of threshold"),
+    format: Literal["json", "ndjson"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """/low-stock/list ile aynı sonuç, hafif yol; ndjson biçimi sabit bellekle akıtılır"""
+    threshold = None if reorder_points else threshold
+    if format == "ndjson":
+        return StreamingResponse(iter_low_stock_ndjson(threshold), media_type=NDJSON_MEDIA_TYPE)
+    rows = await InventoryRowService(db).low_stock_rows(threshold)
+    return Response(dumps(rows_to_records(rows)), media_type="application/json")
+
+
+@router.get("/alerts/list", response_model=List[InventoryAlert])
+async def list_stock_alerts(
+    alert_type: Optional[Literal["low_stock", "out_of_stock"]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    inventory_service = InventoryService(db)
-    return inventory_service.get_low_stock_materials(threshold)
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.list_alerts(alert_type, skip, limit)
+
 
+@router.post("/reorder-points/forecast", response_model=ReorderPointForecastResponse)
+async def apply_forecast_reorder_points(
+    lead_time_days: int = Query(14, ge=1, le=365),
+    service_level_z: float = Query(1.65, ge=0),
+    material_ids: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Yeniden sipariş noktalarını güncel tahminlerden hesaplar"""
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.apply_forecast_reorder_points(
+        lead_time_days, service_level_z, material_ids)
 
-@router.get("/{material_id}/trend")
+
+@router.get("/{material_id}/trend", response_model=List[StockTrendResponse])
 async def get_stock_trend(
     material_id: str,
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
-):
-    # Test verisi
-    from datetime import datetime, timedelta
-    test_data = []
-    base_quantity = 100
-    for i in range(days):
-        date = datetime.now() - timedelta(days=i)
-        test_data.append({
-            "date": date.isoformat(),
-            "quantity": base_quantity,
-            "reserved": base_quantity * 0.2,
-            "available": base_quantity * 0.8
-        })
-    return test_data
-
-
-@router.get("/{material_id}/history")
+    db: AsyncSession = Depends(get_async_db)
+):
+    inventory_service = AsyncInventoryService(db)
+    return await inventory_service.get_stock_trend(material_id, days)
+
+
+@router.get("/{material_id}/history", response_model=List[StockHistoryResponse])
 async def get_stock_history(
     material_id: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
-):
-    # Test verisi
-    test_history = [
-        {
-            "id": "1",
-            "date": datetime.now().isoformat(),
-            "type": "IN",
-            "quantity": 100,
-            "description": "Initial stock",
-            "reference": "REF001"
-        }
-    ]
-    return test_history
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    type: Optional[Literal["in", "out", "reserve", "release"]] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Hareket geçmişi, yeniden eskiye. Gövde düz liste olarak kalır; sonraki
+    sayfanın imleci X-Next-Cursor başlığında döner.
+    """
+    inventory_service = AsyncInventoryService(db)
+    records, next_cursor = await inventory_service.get_stock_history(
+        material_id, limit, cursor, type, start_date, end_date)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
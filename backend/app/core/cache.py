@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """
+    Önbellek arka ucu arayüzü. redis.asyncio.Redis istemcisinin kullandığımız
+    alt kümesiyle aynıdır; Redis istemcisi doğrudan, yerel sahte bir istemci
+    de bu yöntemleri sağlayarak kullanılabilir.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None: ...
+
+    async def delete(self, *keys: str) -> int: ...
+
+    async def incr(self, key: str) -> int: ...
+
+
+class InMemoryCache:
+    """
+    Süreç içi TTL + LRU önbellek (varsayılan arka uç). Süreçler arasında
+    paylaşılmaz; çok işçili kurulumlarda tutarlılık TTL ile sınırlanır.
+    incr sayaçları (ör. liste nesil numarası) LRU dışında tutulur; tahliye
+    edilip sıfırlanırlarsa eski nesildeki sayfalar yeniden geçerli olurdu.
+    """
+
+    def __init__(self, max_items: int = 10_000):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._counters.pop(key, None)
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    async def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(
+                (self._items.pop(key, None) is not None) | (self._counters.pop(key, None) is not None)
+                for key in keys
+            )
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            if key not in self._counters:
+                _, value = self._items.pop(key, (None, b"0"))
+                self._counters[key] = int(value)
+            self._counters[key] += 1
+            return self._counters[key]
+
+
+def create_cache_backend(url: str, max_items: int = 10_000) -> CacheBackend:
+    """memory:// için süreç içi önbellek, redis:// için redis.asyncio istemcisi"""
+    if url.startswith("memory://"):
+        return InMemoryCache(max_items)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(f"Cache URL {url} requires the redis package")
+        return redis.Redis.from_url(url)
+    raise ValueError(f"Unsupported cache URL {url}")
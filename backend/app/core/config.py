@@ -1,4 +1,5 @@
 # app/core/config.py
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +7,67 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "SAP Nexus AI"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
+    # Boşsa DATABASE_URL'den türetilir (postgresql -> asyncpg, sqlite -> aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Bağlantı havuzu
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+
+    # Forecast training
+    FORECAST_MAX_WORKERS: Optional[int] = None
+    # İsteğe bağlı: RLIMIT_AS ile worker'ın sanal bellek (adres alanı) sınırı,
+    # RSS sınırı değildir; Prophet/Stan iş parçacıkları sanal bellek ayırdığı
+    # için RSS'in birkaç katı verilmelidir. Boşsa sınır uygulanmaz.
+    FORECAST_WORKER_MAX_MEMORY_MB: Optional[int] = None
+    FORECAST_WORKER_MAX_TASKS: int = 20
+    FORECAST_JOB_WORKERS: int = 1
+    # Çalışan işlerin canlılık güncelleme aralığı ve sahipsiz sayılma süresi
+    FORECAST_JOB_HEARTBEAT_SECONDS: int = 30
+    FORECAST_JOB_STALE_SECONDS: int = 120
+    FORECAST_MODEL_CACHE_SIZE: int = 64
+    FORECAST_MODEL_WARMUP: int = 16
+    FORECAST_MODEL_TTL_DAYS: Optional[int] = 30
+    # full | reduced | holdout | none
+    FORECAST_VALIDATION_MODE: str = "full"
+    FORECAST_CV_MAX_CUTOFFS: int = 3
+    # Toplu eğitimde CV paralelliği: None (worker içinde), "threads" veya "processes"
+    FORECAST_BATCH_CV_PARALLEL: Optional[str] = None
+
+    # Prophet / baseline yönlendirmesi
+    FORECAST_ROUTING_ENABLED: bool = True
+    FORECAST_PROPHET_MIN_POINTS: int = 52
+    FORECAST_PROPHET_MIN_CV: float = 0.1
+    FORECAST_BASELINE_HORIZON: int = 90
+    FORECAST_BASELINE_ALPHA: float = 0.3
+    FORECAST_INTERMITTENT_ZERO_SHARE: float = 0.3
+
+    # Toplu stok yükleme (INSERT ... ON CONFLICT grup boyutu)
+    INVENTORY_BULK_BATCH_SIZE: int = 1000
+    # count=estimate modunda arama sonuç sayılarının önbellek süresi ve kayıt sınırı
+    INVENTORY_COUNT_CACHE_SECONDS: int = 60
+    INVENTORY_COUNT_CACHE_MAX_ITEMS: int = 1000
+    # pg_trgm olmayan veritabanlarında bellek içi arama indeksinin ömrü
+    INVENTORY_SEARCH_INDEX_TTL: int = 300
+
+    # Stok okuma önbelleği: memory:// (süreç içi) ya da redis://host:port/db
+    INVENTORY_CACHE_URL: str = "memory://"
+    INVENTORY_CACHE_TTL: int = 5
+    INVENTORY_CACHE_MAX_ITEMS: int = 10000
+
+    # stock_history aylık bölümleri (PostgreSQL)
+    INVENTORY_HISTORY_PARTITIONS_AHEAD: int = 2
+    INVENTORY_HISTORY_RETENTION_MONTHS: int = 24
+
+    # Stok olay akışı (SSE): abone başına kuyruk boyu ve canlı tutma aralığı
+    INVENTORY_EVENTS_QUEUE_SIZE: int = 1000
+    INVENTORY_EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Dışa aktarma uçlarında sunucu tarafı imleç grup boyutu (yield_per)
+    INVENTORY_EXPORT_BATCH_SIZE: int = 5000
 
     class Config:
         env_file = ".env"
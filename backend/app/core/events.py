@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import threading
+from itertools import count
+from typing import Any, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+# Kuyruğu taşan aboneye gönderilen olay; istemci durumu yeniden okumalı
+EVENT_RESYNC = "resync"
+
+
+class Subscription:
+    """
+    Bir abonenin sınırlı olay kuyruğu. Kuyruk dolarsa bekleyen olaylar
+    atılır ve yerine tek bir resync olayı konur: yavaş bir istemci ne
+    yayıncıyı bekletir ne de belleği büyütür.
+    """
+
+    def __init__(self, bus: "EventBus", keys: Optional[FrozenSet[str]], max_size: int):
+        self.bus = bus
+        self.keys = keys
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(max_size)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def wants(self, key: Optional[str]) -> bool:
+        return self.keys is None or key in self.keys
+
+    def _offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"id": event["id"], "type": EVENT_RESYNC})
+            self.bus._count_overflow()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Sıradaki olay; timeout dolarsa None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    Süreç içi yayın/abone olay yolu. Olaylar bir anahtara (ör. material_id)
+    bağlıdır; aboneler tüm olaylara ya da belirli anahtarlara abone olabilir.
+    publish engellemez ve herhangi bir thread'den çağrılabilir.
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscriptions: "set[Subscription]" = set()
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, keys: Optional[FrozenSet[str]] = None) -> Subscription:
+        """Çalışan event loop içinden çağrılmalıdır"""
+        subscription = Subscription(self, keys, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, key: Optional[str] = None, **payload: Any) -> None:
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, "key": key, **payload}
+            targets = [s for s in self._subscriptions if s.wants(key)]
+            self.published += 1
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # Abonenin event loop'u kapanmış
+                self.unsubscribe(subscription)
+
+    def _count_overflow(self) -> None:
+        with self._lock:
+            self.overflows += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "published": self.published,
+                "overflows": self.overflows
+            }
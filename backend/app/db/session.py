@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from app.db.base import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.base import SessionLocal, AsyncSessionLocal
 
 
 def get_db():
@@ -8,3 +9,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
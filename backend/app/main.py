@@ -1,7 +1,15 @@
+import logging
+import threading
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.db.base import SessionLocal, AsyncSessionLocal, async_engine
+from app.services.forecast_jobs import job_manager
+from app.services.model_registry import ModelRegistry
+from app.services.stock_history_partitions import StockHistoryPartitionManager
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -11,9 +19,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Sayfalama imleci başlıkla döner (geçmiş ve ndjson listeleri)
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+def warm_up_models():
+    db = SessionLocal()
+    try:
+        ModelRegistry(db).warm_up()
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def startup():
+    job_manager.recover()
+    # Model yükleme uygulamanın açılışını geciktirmesin
+    threading.Thread(target=warm_up_models, name="model-warmup",
+                     daemon=True).start()
+
+
+@app.on_event("startup")
+async def ensure_history_partitions():
+    # Günlük bakım işi çalışmasa da yakın ayların bölümleri hazır olsun
+    try:
+        async with AsyncSessionLocal() as db:
+            await StockHistoryPartitionManager(db).ensure_partitions()
+    except Exception as e:
+        logger.error(f"Stock history partition check failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    job_manager.shutdown()
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to SAP Nexus AI API"}
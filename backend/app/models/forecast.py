@@ -0,0 +1,122 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Boolean, Index, func, text
+from datetime import datetime
+from typing import Optional, Any, Dict
+from pydantic import BaseModel
+from app.db.base import Base
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+
+class TrainingJob(Base):
+    __tablename__ = "training_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)
+    status = Column(String, nullable=False, index=True)
+    progress = Column(Float, default=0)
+    completed_items = Column(Integer, default=0)
+    total_items = Column(Integer, nullable=True)
+    params = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # İşi çalıştıran süreç ve son canlılık zamanı; yeniden başlatmada
+    # yalnızca sahibi ölmüş işler kapatılır
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class TrainingJobRead(BaseModel):
+    id: str
+    job_type: str
+    status: str
+    progress: float
+    completed_items: int
+    total_items: Optional[int] = None
+    params: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ForecastModel(Base):
+    __tablename__ = "forecast_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    material_id = Column(String, nullable=False, index=True)
+    version = Column(String, nullable=False)
+    model_type = Column(String, nullable=False, default="prophet")
+    model_path = Column(String, nullable=True)
+    metrics = Column(JSON, nullable=True)
+    validation_metrics = Column(JSON, nullable=True)
+    training_size = Column(Integer, nullable=True)
+    data_hash = Column(String, nullable=True)
+    is_latest = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_forecast_models_material_id_version",
+              "material_id", "version", unique=True),
+        Index("ix_forecast_models_is_latest", "is_latest", "created_at"),
+        # Malzeme başına en fazla bir latest sürüm
+        Index("uq_forecast_models_latest_material", "material_id", unique=True,
+              postgresql_where=text("is_latest"), sqlite_where=text("is_latest")),
+    )
+
+
+class ForecastModelRead(BaseModel):
+    id: int
+    material_id: str
+    version: str
+    model_type: str
+    model_path: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
+    validation_metrics: Optional[Dict[str, Any]] = None
+    training_size: Optional[int] = None
+    data_hash: Optional[str] = None
+    is_latest: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ForecastPoint(BaseModel):
+    ds: datetime
+    yhat: float
+    yhat_lower: Optional[float] = None
+    yhat_upper: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ForecastResponse(BaseModel):
+    material_id: str
+    version: str
+    forecast: list[ForecastPoint]
+
+
+class ForecastPredictionResponse(ForecastResponse):
+    cached: bool
+
+
+class StoredForecastPoint(Base):
+    __tablename__ = "forecast_points"
+
+    material_id = Column(String, primary_key=True)
+    version = Column(String, primary_key=True)
+    ds = Column(DateTime, primary_key=True)
+    yhat = Column(Float, nullable=False)
+    yhat_lower = Column(Float, nullable=True)
+    yhat_upper = Column(Float, nullable=True)
@@ -1,13 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, func, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, func, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import validates, relationship
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel, Field
 from app.db.base import Base
 
 
 class MaterialStock(Base):
     __tablename__ = "material_stocks"
+    __table_args__ = (
+        Index("ix_material_stocks_available", "available"),
+        # Yeniden sipariş noktasının altındaki malzemeler (kısmi indeks)
+        Index("ix_material_stocks_below_reorder", "material_id",
+              postgresql_where=text("available <= reorder_point"),
+              sqlite_where=text("available <= reorder_point")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     material_id = Column(String, unique=True, index=True)
@@ -15,6 +22,7 @@ class MaterialStock(Base):
     quantity = Column(Float)
     reserved = Column(Float, default=0)
     available = Column(Float)
+    reorder_point = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -40,6 +48,7 @@ class MaterialStockBase(BaseModel):
     material_description: Optional[str] = None
     quantity: float = Field(ge=0)
     reserved: float = Field(ge=0, default=0)
+    reorder_point: Optional[float] = Field(ge=0, default=None)
 
     class Config:
         from_attributes = True
@@ -53,6 +62,7 @@ class MaterialStockUpdate(BaseModel):
     material_description: Optional[str] = None
     quantity: Optional[float] = Field(ge=0, default=None)
     reserved: Optional[float] = Field(ge=0, default=None)
+    reorder_point: Optional[float] = Field(ge=0, default=None)
 
     class Config:
         from_attributes = True
@@ -70,7 +80,9 @@ class MaterialStockRead(MaterialStockBase):
 
 class MaterialStockReadList(BaseModel):
     items: list[MaterialStockRead]
-    total: int
+    # count=none isteklerinde None
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class StockTrendResponse(BaseModel):
@@ -80,12 +92,58 @@ class StockTrendResponse(BaseModel):
     available: float
 
 
+class StockAdjustmentItem(BaseModel):
+    material_id: str
+    quantity_change: float
+    is_reserved: bool = False
+    notes: Optional[str] = None
+
+
+class StockAdjustmentBulkRequest(BaseModel):
+    items: List[StockAdjustmentItem] = Field(min_length=1, max_length=10000)
+
+
+class StockAdjustmentItemResult(BaseModel):
+    index: int
+    material_id: str
+    success: bool
+    previous_quantity: Optional[float] = None
+    new_quantity: Optional[float] = None
+    error: Optional[str] = None
+
+
+class StockAdjustmentBulkResponse(BaseModel):
+    applied: int
+    failed: int
+    committed: bool
+    results: List[StockAdjustmentItemResult]
+
+
+class BulkImportError(BaseModel):
+    position: int
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    received: int
+    upserted: int
+    failed: int
+    errors: List[BulkImportError]
+
+
 class StockHistory(Base):
+    # PostgreSQL'de created_at'e göre aylık bölümlenmiştir (birincil anahtar
+    # veritabanında (id, created_at)); bkz. stock_history_partitions
     __tablename__ = "stock_history"
+    __table_args__ = (
+        # Malzeme geçmişinin tarih aralığı ve keyset sayfalaması için;
+        # tek sütunlu material_id indeksinin yerini alır
+        Index("ix_stock_history_material_created_id", "material_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     material_id = Column(String, ForeignKey(
-        "material_stocks.material_id"), index=True)
+        "material_stocks.material_id"))
     quantity_change = Column(Float)
     is_reserved = Column(Boolean, default=False)
     previous_quantity = Column(Float)
@@ -96,6 +154,52 @@ class StockHistory(Base):
     material = relationship("MaterialStock", backref="history")
 
 
+class StockDailySnapshot(Base):
+    """
+    Malzeme başına gün sonu stok durumu. Yalnızca stoğun değiştiği günler
+    için satır tutulur; aradaki günler bir önceki satırın değeriyle doldurulur.
+    """
+    __tablename__ = "stock_daily_snapshots"
+
+    material_id = Column(String, ForeignKey(
+        "material_stocks.material_id", ondelete="CASCADE"), primary_key=True)
+    snapshot_date = Column(Date, primary_key=True)
+    quantity = Column(Float, nullable=False)
+    reserved = Column(Float, nullable=False)
+    available = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+ALERT_OUT_OF_STOCK = "out_of_stock"
+ALERT_LOW_STOCK = "low_stock"
+
+
+class StockAlert(Base):
+    """
+    Malzeme başına açık stok uyarısı. Stoğu değiştiren her işlemde
+    güncellenir; durum düzelince satır silinir, böylece tablo yalnızca
+    açık uyarıları içerir.
+    """
+    __tablename__ = "stock_alerts"
+    __table_args__ = (
+        Index("ix_stock_alerts_created_at", "created_at"),
+    )
+
+    material_id = Column(String, ForeignKey(
+        "material_stocks.material_id", ondelete="CASCADE"), primary_key=True)
+    alert_type = Column(String, nullable=False)
+    threshold = Column(Float, nullable=False)
+    current_level = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ReorderPointForecastResponse(BaseModel):
+    updated: int
+    lead_time_days: int
+    service_level_z: float
+
+
 class StockHistoryResponse(BaseModel):
     id: int
     material_id: str
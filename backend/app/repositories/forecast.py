@@ -0,0 +1,169 @@
+from datetime import datetime
+from sqlalchemy import insert, delete, or_, and_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from app.models.forecast import (
+    TrainingJob,
+    ForecastModel,
+    StoredForecastPoint,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_FAILED
+)
+
+
+class TrainingJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        """ID'ye göre eğitim işini getirir"""
+        return self.db.query(TrainingJob).filter(
+            TrainingJob.id == job_id
+        ).first()
+
+    def list_jobs(self, limit: int = 50, status: Optional[str] = None) -> List[TrainingJob]:
+        """Son eğitim işlerini getirir"""
+        query = self.db.query(TrainingJob)
+        if status:
+            query = query.filter(TrainingJob.status == status)
+        return query.order_by(TrainingJob.created_at.desc()).limit(limit).all()
+
+    def create(self, job: TrainingJob) -> TrainingJob:
+        """Yeni eğitim işi kaydı oluşturur"""
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def update(self, job: TrainingJob) -> TrainingJob:
+        """Eğitim işi kaydını günceller"""
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def touch(self, worker_id: str, now: datetime) -> int:
+        """Sürecin yarım kalan işlerinin canlılık zamanını günceller"""
+        count = self.db.query(TrainingJob).filter(
+            TrainingJob.worker_id == worker_id,
+            TrainingJob.status.in_([JOB_STATUS_QUEUED, JOB_STATUS_RUNNING])
+        ).update({"heartbeat_at": now}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+    def fail_stale(self, stale_before: datetime, error: str) -> int:
+        """
+        Canlılık zamanı stale_before'dan eski yarım işleri (sahibi çalışmayan)
+        başarısız olarak işaretler. Canlılık bilgisi olmayan eski kayıtlar
+        oluşturulma zamanına göre değerlendirilir.
+        """
+        count = self.db.query(TrainingJob).filter(
+            TrainingJob.status.in_([JOB_STATUS_QUEUED, JOB_STATUS_RUNNING]),
+            or_(
+                TrainingJob.heartbeat_at < stale_before,
+                and_(TrainingJob.heartbeat_at.is_(None), TrainingJob.created_at < stale_before)
+            )
+        ).update({"status": JOB_STATUS_FAILED, "error": error}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+
+class ForecastModelRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_latest(self, material_id: str) -> Optional[ForecastModel]:
+        """Malzemenin en güncel model kaydını getirir"""
+        return self.db.query(ForecastModel).filter(
+            ForecastModel.material_id == material_id,
+            ForecastModel.is_latest.is_(True)
+        ).first()
+
+    def get_version(self, material_id: str, version: str) -> Optional[ForecastModel]:
+        """Malzemenin belirli bir model sürümünü getirir"""
+        return self.db.query(ForecastModel).filter(
+            ForecastModel.material_id == material_id,
+            ForecastModel.version == version
+        ).first()
+
+    def list_versions(self, material_id: str, limit: int = 20) -> List[ForecastModel]:
+        """Malzemenin model sürümlerini yeniden eskiye getirir"""
+        return self.db.query(ForecastModel).filter(
+            ForecastModel.material_id == material_id
+        ).order_by(ForecastModel.created_at.desc()).limit(limit).all()
+
+    def list_latest(self, skip: int = 0, limit: int = 100) -> List[ForecastModel]:
+        """Her malzemenin en güncel modelini son eğitilenden başlayarak getirir"""
+        return self.db.query(ForecastModel).filter(
+            ForecastModel.is_latest.is_(True)
+        ).order_by(ForecastModel.created_at.desc()).offset(skip).limit(limit).all()
+
+    def get_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Her malzemenin en güncel modelinin veri özeti ve eğitim zamanını getirir"""
+        rows = self.db.query(
+            ForecastModel.material_id,
+            ForecastModel.data_hash,
+            ForecastModel.created_at
+        ).filter(ForecastModel.is_latest.is_(True)).all()
+        return {
+            material_id: {"data_hash": data_hash, "trained_at": created_at}
+            for material_id, data_hash, created_at in rows
+        }
+
+    def create_latest(self, model: ForecastModel) -> ForecastModel:
+        """
+        Yeni model sürümünü kaydeder ve önceki sürümlerin latest bayrağını kaldırır.
+        Mevcut latest satırı kilitlenerek aynı malzeme için eşzamanlı kayıtlar
+        sıraya sokulur; ilk sürümde yarışan ikinci kayıt kısmi benzersiz
+        indeks (uq_forecast_models_latest_material) nedeniyle hata alır.
+        """
+        self.db.query(ForecastModel.id).filter(
+            ForecastModel.material_id == model.material_id,
+            ForecastModel.is_latest.is_(True)
+        ).with_for_update().all()
+        self.db.query(ForecastModel).filter(
+            ForecastModel.material_id == model.material_id,
+            ForecastModel.is_latest.is_(True)
+        ).update({"is_latest": False}, synchronize_session=False)
+        model.is_latest = True
+        self.db.add(model)
+        self.db.commit()
+        self.db.refresh(model)
+        return model
+
+
+class ForecastPointRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def replace_points(self, material_id: str, version: str, points: List[Dict[str, Any]]) -> int:
+        """Bir model sürümünün tahmin noktalarını toplu olarak yazar"""
+        self.db.execute(delete(StoredForecastPoint).where(
+            StoredForecastPoint.material_id == material_id,
+            StoredForecastPoint.version == version
+        ))
+        if points:
+            self.db.execute(insert(StoredForecastPoint), [
+                {"material_id": material_id, "version": version, **point}
+                for point in points
+            ])
+        self.db.commit()
+        return len(points)
+
+    def get_points(
+        self,
+        material_id: str,
+        version: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[StoredForecastPoint]:
+        """Tahmin noktalarını (birincil anahtar sırasıyla) tarih aralığına göre getirir"""
+        query = self.db.query(StoredForecastPoint).filter(
+            StoredForecastPoint.material_id == material_id,
+            StoredForecastPoint.version == version
+        )
+        if start_date:
+            query = query.filter(StoredForecastPoint.ds >= start_date)
+        if end_date:
+            query = query.filter(StoredForecastPoint.ds <= end_date)
+        return query.order_by(StoredForecastPoint.ds.asc()).all()
@@ -1,67 +1,605 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Tuple, Optional
-from app.models.inventory import MaterialStock, StockHistory
+from datetime import date, datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    and_, or_, select, func, insert, update, delete, text, case, literal, literal_column,
+    tuple_, Date, Row
+)
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple, Optional
+from app.models.inventory import (
+    MaterialStock,
+    StockHistory,
+    StockDailySnapshot,
+    StockAlert,
+    ALERT_OUT_OF_STOCK,
+    ALERT_LOW_STOCK
+)
+from app.models.forecast import ForecastModel, StoredForecastPoint
 
+# Bu uzunluğun altındaki terimler trigram ile aranamaz; yalnızca
+# material_id önek eşleşmesi yapılır
+SEARCH_TRIGRAM_MIN_LENGTH = 3
 
-class InventoryRepository:
-    def __init__(self, db: Session):
+# Hafif okuma yolunun sütunları; MaterialStockRead alanlarıyla aynı sırada
+STOCK_ROW_COLUMNS = (
+    MaterialStock.id,
+    MaterialStock.material_id,
+    MaterialStock.material_description,
+    MaterialStock.quantity,
+    MaterialStock.reserved,
+    MaterialStock.reorder_point,
+    MaterialStock.available,
+    MaterialStock.created_at,
+    MaterialStock.updated_at,
+)
+STOCK_ROW_FIELDS = tuple(column.key for column in STOCK_ROW_COLUMNS)
+HISTORY_ROW_COLUMNS = (
+    StockHistory.id,
+    StockHistory.material_id,
+    StockHistory.quantity_change,
+    StockHistory.is_reserved,
+    StockHistory.previous_quantity,
+    StockHistory.new_quantity,
+    StockHistory.notes,
+    StockHistory.created_at,
+)
+HISTORY_ROW_FIELDS = tuple(column.key for column in HISTORY_ROW_COLUMNS)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_clause(search: str):
+    """Her iki alanda alt dize eşleşmesi (büyük/küçük harf duyarsız)"""
+    term = _escape_like(search.lower())
+    return or_(
+        MaterialStock.material_id.ilike(f"%{term}%", escape="\\"),
+        MaterialStock.material_description.ilike(f"%{term}%", escape="\\")
+    )
+
+
+def _search_rank(search: str):
+    """
+    Arama alaka puanı: tam eşleşme, material_id öneki, ardından pg_trgm
+    benzerliği. Trigram üretmeyen kısa terimlerde yalnızca ilk iki ölçüt
+    geçerlidir.
+    """
+    term = search.lower()
+    material_id = func.lower(MaterialStock.material_id)
+    rank = case(
+        (material_id == term, 3),
+        (material_id.like(_escape_like(term) + "%", escape="\\"), 2),
+        else_=0
+    )
+    if len(term) < SEARCH_TRIGRAM_MIN_LENGTH:
+        return rank
+    return rank + func.greatest(
+        func.similarity(MaterialStock.material_id, term),
+        func.similarity(func.coalesce(MaterialStock.material_description, ""), term)
+    )
+
+
+def _history_query(
+    material_id: str,
+    before: Optional[Tuple[datetime, int]] = None,
+    movement_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Hareket geçmişi sorgusu, yeniden eskiye. (material_id, created_at, id)
+    bileşik indeksi hem filtreyi hem sıralamayı karşılar; before verilirse
+    o konumdan sonrası keyset ile okunur.
+    """
+    query = select(StockHistory).where(StockHistory.material_id == material_id)
+    if start_date is not None:
+        query = query.where(StockHistory.created_at >= start_date)
+    if end_date is not None:
+        query = query.where(StockHistory.created_at <= end_date)
+    if before is not None:
+        query = query.where(tuple_(StockHistory.created_at, StockHistory.id) < before)
+    if movement_type is not None:
+        reserved = movement_type in ("reserve", "release")
+        increase = movement_type in ("in", "reserve")
+        query = query.where(
+            StockHistory.is_reserved.is_(reserved),
+            StockHistory.quantity_change > 0 if increase else StockHistory.quantity_change < 0
+        )
+    return query.order_by(StockHistory.created_at.desc(), StockHistory.id.desc())
+
+
+def _snapshot_update(excluded) -> Dict[str, Any]:
+    return {
+        "quantity": excluded.quantity,
+        "reserved": excluded.reserved,
+        "available": excluded.available,
+        "updated_at": func.now()
+    }
+
+
+class AsyncInventoryRepository:
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_by_material_id(self, material_id: str) -> Optional[MaterialStock]:
+    async def get_by_material_id(self, material_id: str) -> Optional[MaterialStock]:
         """Malzeme ID'sine göre stok kaydı getirir"""
-        return self.db.query(MaterialStock).filter(
-            MaterialStock.material_id == material_id
-        ).first()
+        result = await self.db.execute(
+            select(MaterialStock).where(MaterialStock.material_id == material_id)
+        )
+        return result.scalars().first()
+
+    @property
+    def dialect(self) -> str:
+        return self.db.bind.dialect.name
+
+    def _stocks_query(self, search: Optional[str] = None):
+        query = select(MaterialStock)
+        if search:
+            query = query.where(_search_clause(search))
+        return query
 
-    def list_stocks(
+    async def list_stocks(
         self,
         skip: int = 0,
         limit: int = 100,
-        search: Optional[str] = None
-    ) -> Tuple[List[MaterialStock], int]:
-        """Stok listesi ve toplam kayıt sayısını getirir"""
-        query = self.db.query(MaterialStock)
+        search: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> List[MaterialStock]:
+        """
+        material_id sırasına göre stok listesi getirir. after verilirse
+        keyset sayfalama yapılır (material_id > after) ve skip yok sayılır.
+        """
+        query = self._stocks_query(search).order_by(MaterialStock.material_id)
+        if after is not None:
+            query = query.where(MaterialStock.material_id > after)
+        elif skip:
+            query = query.offset(skip)
+        result = await self.db.execute(query.limit(limit))
+        return list(result.scalars().all())
 
-        if search:
-            query = query.filter(
-                or_(
-                    MaterialStock.material_id.ilike(f"%{search}%"),
-                    MaterialStock.material_description.ilike(f"%{search}%")
-                )
-            )
+    async def count_stocks(self, search: Optional[str] = None) -> int:
+        """Filtreye uyan kayıtların tam sayısı"""
+        return await self.db.scalar(
+            select(func.count()).select_from(self._stocks_query(search).subquery()))
+
+    async def estimate_stock_count(self) -> Optional[int]:
+        """
+        Planlayıcı istatistiklerinden (pg_class.reltuples) tahmini satır sayısı.
+        PostgreSQL dışında ya da tablo henüz analiz edilmemişse None döner.
+        """
+        if self.dialect != "postgresql":
+            return None
+        estimate = await self.db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": MaterialStock.__tablename__}
+        )
+        return int(estimate) if estimate is not None and estimate >= 0 else None
 
-        total = query.count()
-        items = query.offset(skip).limit(limit).all()
+    async def search_stocks(self, search: str, skip: int = 0, limit: int = 100) -> List[MaterialStock]:
+        """
+        Alaka sırasına göre arama (PostgreSQL). Tam ve önek eşleşmeler önce,
+        ardından pg_trgm benzerliği; ILIKE filtreleri trigram GIN indekslerini
+        kullanır.
+        """
+        query = self._stocks_query(search).order_by(
+            _search_rank(search).desc(), MaterialStock.material_id)
+        result = await self.db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
 
-        return items, total
+    async def search_stock_rows(self, search: str, skip: int = 0, limit: int = 100) -> List[Row]:
+        """search_stocks ile aynı sıra; ORM nesnesi yerine STOCK_ROW_COLUMNS demetleri"""
+        query = select(*STOCK_ROW_COLUMNS).where(_search_clause(search)).order_by(
+            _search_rank(search).desc(), MaterialStock.material_id)
+        result = await self.db.execute(query.offset(skip).limit(limit))
+        return list(result.all())
 
-    def create(self, material_stock: MaterialStock) -> MaterialStock:
+    async def list_search_documents(self) -> List[Tuple[str, Optional[str]]]:
+        """Bellek içi arama indeksi için (material_id, açıklama) çiftleri"""
+        result = await self.db.execute(
+            select(MaterialStock.material_id, MaterialStock.material_description))
+        return [tuple(row) for row in result.all()]
+
+    async def get_many(self, material_ids: List[str]) -> List[MaterialStock]:
+        """Kayıtları verilen material_id sırasıyla getirir"""
+        if not material_ids:
+            return []
+        result = await self.db.execute(
+            select(MaterialStock).where(MaterialStock.material_id.in_(material_ids)))
+        by_id = {stock.material_id: stock for stock in result.scalars().all()}
+        return [by_id[m] for m in material_ids if m in by_id]
+
+    async def get_many_rows(self, material_ids: List[str]) -> List[Row]:
+        """get_many ile aynı sıra; STOCK_ROW_COLUMNS demetleri"""
+        if not material_ids:
+            return []
+        result = await self.db.execute(
+            select(*STOCK_ROW_COLUMNS).where(MaterialStock.material_id.in_(material_ids)))
+        by_id = {row.material_id: row for row in result.all()}
+        return [by_id[m] for m in material_ids if m in by_id]
+
+    async def add(self, material_stock: MaterialStock) -> MaterialStock:
+        """Yeni stok kaydını ekler ve flush eder (commit etmez)"""
+        self.db.add(material_stock)
+        await self.db.flush()
+        return material_stock
+
+    async def create(self, material_stock: MaterialStock) -> MaterialStock:
         """Yeni stok kaydı oluşturur"""
         self.db.add(material_stock)
-        self.db.commit()
-        self.db.refresh(material_stock)
+        await self.db.commit()
+        await self.db.refresh(material_stock)
         return material_stock
 
-    def update(self, material_stock: MaterialStock) -> MaterialStock:
+    async def update(self, material_stock: MaterialStock) -> MaterialStock:
         """Stok kaydını günceller"""
-        self.db.commit()
-        self.db.refresh(material_stock)
+        await self.db.commit()
+        await self.db.refresh(material_stock)
         return material_stock
 
-    def delete(self, material_stock: MaterialStock) -> None:
+    async def delete(self, material_stock: MaterialStock) -> None:
         """Stok kaydını siler"""
-        self.db.delete(material_stock)
-        self.db.commit()
+        await self.db.delete(material_stock)
+        await self.db.commit()
+
+    async def get_many_for_update(self, material_ids: List[str]) -> List[MaterialStock]:
+        """
+        Birden çok stok kaydını tek sorguda satır kilidiyle getirir.
+        Kilitler malzeme ID sırasıyla alınır; eşzamanlı toplu işlemler kilitlenmez.
+        """
+        result = await self.db.execute(
+            select(MaterialStock)
+            .where(MaterialStock.material_id.in_(material_ids))
+            .order_by(MaterialStock.material_id)
+            .with_for_update()
+            # Kilit altında okunan değerler oturumdaki eski kopyanın yerine geçer
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def increment_stock(
+        self,
+        material_id: str,
+        quantity_change: float,
+        is_reserved: bool = False
+    ) -> Optional[MaterialStock]:
+        """
+        Stok hareketini tek atomik UPDATE ... RETURNING ile uygular (commit etmez).
+        Yeni değerler satırın o anki değerlerinden SQL içinde hesaplanır;
+        eşzamanlı hareketler birbirini ezmez. Değişmezler (reserved >= 0,
+        reserved <= quantity) WHERE içinde denetlenir; malzeme yoksa ya da
+        hareket değişmezi bozacaksa None döner.
+        """
+        reserved = func.coalesce(MaterialStock.reserved, 0)
+        if is_reserved:
+            new_reserved = reserved + quantity_change
+            values = {
+                "reserved": new_reserved,
+                "available": MaterialStock.quantity - new_reserved
+            }
+            invariant = and_(new_reserved >= 0, new_reserved <= MaterialStock.quantity)
+        else:
+            new_quantity = MaterialStock.quantity + quantity_change
+            values = {
+                "quantity": new_quantity,
+                "available": new_quantity - reserved
+            }
+            invariant = new_quantity >= reserved
+
+        stmt = (
+            update(MaterialStock)
+            .where(MaterialStock.material_id == material_id, invariant)
+            .values(updated_at=func.now(), **values)
+            .returning(MaterialStock)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def add_stock_history_bulk(self, rows: List[Dict[str, Any]]) -> None:
+        """Stok hareketlerini tek çok satırlı INSERT ile ekler (commit etmez)"""
+        await self.db.execute(insert(StockHistory), rows)
+
+    def _dialect_insert(self):
+        """ON CONFLICT destekli insert() yapıcısı"""
+        if self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise RuntimeError(f"INSERT ... ON CONFLICT is not available for the {self.dialect} dialect")
+        return dialect_insert
+
+    async def upsert_stocks(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Stok kayıtlarını tek çok satırlı INSERT ... ON CONFLICT ile ekler/günceller
+        (commit etmez). Mevcut kayıtlarda available SQL içinde hesaplanır;
+        verilmeyen açıklama ve yeniden sipariş noktası korunur. Yazılan satırlar
+        STOCK_ROW_FIELDS ve yeni eklenip eklenmediğini gösteren "created" ile döner.
+        """
+        if not rows:
+            return []
+        stmt = self._dialect_insert()(MaterialStock).values(rows)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MaterialStock.material_id],
+            set_={
+                "material_description": func.coalesce(
+                    excluded.material_description, MaterialStock.material_description),
+                "quantity": excluded.quantity,
+                "reserved": excluded.reserved,
+                "available": excluded.quantity - excluded.reserved,
+                "reorder_point": func.coalesce(
+                    excluded.reorder_point, MaterialStock.reorder_point),
+                "updated_at": func.now()
+            }
+        )
+        if self.dialect == "postgresql":
+            # Yeni eklenen satırın xmax sistem sütunu 0'dır, güncellenenin değildir
+            result = await self.db.execute(stmt.returning(
+                *STOCK_ROW_COLUMNS, literal_column("xmax = 0").label("created")))
+            return [dict(row._mapping) for row in result]
+
+        existing = set((await self.db.execute(
+            select(MaterialStock.material_id).where(
+                MaterialStock.material_id.in_([row["material_id"] for row in rows]))
+        )).scalars())
+        result = await self.db.execute(stmt.returning(*STOCK_ROW_COLUMNS))
+        return [
+            {**row._mapping, "created": row.material_id not in existing}
+            for row in result
+        ]
+
+    async def upsert_daily_snapshots(self, rows: List[Dict[str, Any]]) -> None:
+        """Gün sonu stok durumlarını yazar; aynı gündeki önceki değerin üzerine yazar (commit etmez)"""
+        if not rows:
+            return
+        stmt = self._dialect_insert()(StockDailySnapshot).values(rows)
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[StockDailySnapshot.material_id, StockDailySnapshot.snapshot_date],
+            set_=_snapshot_update(stmt.excluded)
+        ))
+
+    async def insert_missing_daily_snapshots(self, rows: List[Dict[str, Any]]) -> int:
+        """Yalnızca satırı olmayan günleri yazar, mevcut değerlere dokunmaz (commit etmez)"""
+        if not rows:
+            return 0
+        stmt = self._dialect_insert()(StockDailySnapshot).values(rows)
+        result = await self.db.execute(stmt.on_conflict_do_nothing(
+            index_elements=[StockDailySnapshot.material_id, StockDailySnapshot.snapshot_date]
+        ))
+        return result.rowcount
 
-    def get_low_stock_materials(self, threshold: float) -> List[MaterialStock]:
-        """Düşük stoklu malzemeleri getirir"""
-        return self.db.query(MaterialStock).filter(
-            MaterialStock.available <= threshold
-        ).all()
+    async def capture_daily_snapshots(self, snapshot_date: date) -> int:
+        """Tüm malzemelerin mevcut durumunu tek INSERT ... SELECT ile o güne yazar (commit etmez)"""
+        source = select(
+            MaterialStock.material_id,
+            literal(snapshot_date, Date),
+            MaterialStock.quantity,
+            func.coalesce(MaterialStock.reserved, 0),
+            MaterialStock.available
+        # WHERE, SQLite'ta INSERT ... SELECT ... ON CONFLICT ayrıştırması için de gerekli
+        ).where(MaterialStock.quantity.isnot(None), MaterialStock.available.isnot(None))
+        stmt = self._dialect_insert()(StockDailySnapshot).from_select(
+            ["material_id", "snapshot_date", "quantity", "reserved", "available"], source)
+        result = await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[StockDailySnapshot.material_id, StockDailySnapshot.snapshot_date],
+            set_=_snapshot_update(stmt.excluded)
+        ))
+        return result.rowcount
 
-    def create_stock_history(
+    async def get_daily_snapshots(
+        self,
+        material_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[StockDailySnapshot]:
+        """
+        Aralıktaki gün sonu durumlarını ve aralık başlangıcından önceki son
+        durumu tek birincil anahtar aralık okumasıyla getirir.
+        """
+        carry_in = select(func.max(StockDailySnapshot.snapshot_date)).where(
+            StockDailySnapshot.material_id == material_id,
+            StockDailySnapshot.snapshot_date <= start_date
+        ).scalar_subquery()
+        result = await self.db.execute(
+            select(StockDailySnapshot).where(
+                StockDailySnapshot.material_id == material_id,
+                StockDailySnapshot.snapshot_date >= func.coalesce(carry_in, start_date),
+                StockDailySnapshot.snapshot_date <= end_date
+            ).order_by(StockDailySnapshot.snapshot_date)
+        )
+        return list(result.scalars().all())
+
+    async def get_stock_history_paginated(
+        self,
+        material_id: str,
+        limit: int = 100,
+        before: Optional[Tuple[datetime, int]] = None,
+        movement_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[StockHistory]:
+        """Stok hareketlerini yeniden eskiye keyset sayfalamayla getirir"""
+        query = _history_query(material_id, before, movement_type, start_date, end_date)
+        result = await self.db.execute(query.limit(limit))
+        return list(result.scalars().all())
+
+    async def get_materials_with_history(self, since: datetime) -> List[str]:
+        result = await self.db.execute(
+            select(StockHistory.material_id).where(StockHistory.created_at >= since)
+            .distinct().order_by(StockHistory.material_id)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _low_stock_query(threshold: Optional[float], *entities):
+        query = select(*entities)
+        if threshold is not None:
+            query = query.where(MaterialStock.available <= threshold)
+        else:
+            query = query.join(StockAlert, StockAlert.material_id == MaterialStock.material_id)
+        return query.order_by(MaterialStock.available, MaterialStock.material_id)
+
+    async def get_low_stock_materials(self, threshold: Optional[float] = None) -> List[MaterialStock]:
+        """
+        Düşük stoklu malzemeleri getirir. threshold verilirse available
+        indeksi üzerinden aralık taraması, verilmezse açık uyarılar kullanılır.
+        """
+        result = await self.db.execute(self._low_stock_query(threshold, MaterialStock))
+        return list(result.scalars().all())
+
+    async def list_stock_rows(
+        self,
+        limit: int = 100,
+        search: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> List[Row]:
+        """list_stocks ile aynı sıra; ORM nesnesi yerine STOCK_ROW_COLUMNS demetleri"""
+        query = select(*STOCK_ROW_COLUMNS).order_by(MaterialStock.material_id)
+        if search:
+            query = query.where(_search_clause(search))
+        if after is not None:
+            query = query.where(MaterialStock.material_id > after)
+        result = await self.db.execute(query.limit(limit))
+        return list(result.all())
+
+    async def stream_low_stock_rows(
+        self,
+        threshold: Optional[float] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Düşük stoklu malzemeleri STOCK_ROW_COLUMNS demetleri olarak gruplar halinde akıtır"""
+        async for rows in self._stream(self._low_stock_query(threshold, *STOCK_ROW_COLUMNS), batch_size):
+            yield rows
+
+    async def stream_stock_rows(self, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """Tüm stok tablosu, material_id sırasıyla"""
+        query = select(*STOCK_ROW_COLUMNS).order_by(MaterialStock.material_id)
+        async for rows in self._stream(query, batch_size):
+            yield rows
+
+    async def stream_stock_history_rows(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        material_id: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """[start_date, end_date) aralığındaki hareketler, created_at sırasıyla"""
+        query = select(*HISTORY_ROW_COLUMNS).where(
+            StockHistory.created_at >= start_date,
+            StockHistory.created_at < end_date
+        )
+        if material_id is not None:
+            query = query.where(StockHistory.material_id == material_id)
+        query = query.order_by(StockHistory.created_at, StockHistory.id)
+        async for rows in self._stream(query, batch_size):
+            yield rows
+
+    async def _stream(self, query, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+        """
+        Sunucu tarafı imleçle (yield_per) gruplar halinde okur; sonuç kümesi
+        belleğe alınmaz.
+        """
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def refresh_alerts(self, material_ids: List[str]) -> None:
+        """
+        Verilen malzemelerin uyarılarını güncel stokla eşitler (commit etmez):
+        eşik altındakiler eklenir/güncellenir, düzelenlerin uyarısı silinir.
+        """
+        if not material_ids:
+            return
+        # Bekleyen ORM değişiklikleri SQL tarafında görülebilsin
+        await self.db.flush()
+        alerting = or_(
+            MaterialStock.available <= 0,
+            MaterialStock.available <= MaterialStock.reorder_point
+        )
+        source = select(
+            MaterialStock.material_id,
+            case((MaterialStock.available <= 0, ALERT_OUT_OF_STOCK), else_=ALERT_LOW_STOCK),
+            func.coalesce(MaterialStock.reorder_point, 0),
+            MaterialStock.available
+        ).where(MaterialStock.material_id.in_(material_ids), alerting)
+        stmt = self._dialect_insert()(StockAlert).from_select(
+            ["material_id", "alert_type", "threshold", "current_level"], source)
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[StockAlert.material_id],
+            set_={
+                "alert_type": stmt.excluded.alert_type,
+                "threshold": stmt.excluded.threshold,
+                "current_level": stmt.excluded.current_level,
+                "updated_at": func.now()
+            }
+        ))
+        await self.db.execute(
+            delete(StockAlert).where(
+                StockAlert.material_id.in_(material_ids),
+                StockAlert.material_id.not_in(
+                    select(MaterialStock.material_id).where(
+                        MaterialStock.material_id.in_(material_ids), alerting))
+            )
+        )
+
+    async def list_alerts(
+        self,
+        alert_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[StockAlert]:
+        """Açık uyarılar, en eskiden yeniye"""
+        query = select(StockAlert)
+        if alert_type:
+            query = query.where(StockAlert.alert_type == alert_type)
+        result = await self.db.execute(
+            query.order_by(StockAlert.created_at, StockAlert.material_id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_lead_time_forecasts(
+        self,
+        start: datetime,
+        end: datetime,
+        material_ids: Optional[List[str]] = None
+    ) -> List[Tuple[int, str, float, float]]:
+        """
+        Her malzemenin güncel tahmininden [start, end) aralığı için
+        (id, material_id, toplam yhat, toplam varyans) döner. Varyans
+        tahmin aralığı genişliğinden (%95, ±1.96σ) türetilir.
+        """
+        sigma = (func.coalesce(StoredForecastPoint.yhat_upper, StoredForecastPoint.yhat)
+                 - StoredForecastPoint.yhat) / 1.96
+        query = (
+            select(
+                MaterialStock.id,
+                MaterialStock.material_id,
+                func.sum(StoredForecastPoint.yhat),
+                func.sum(sigma * sigma)
+            )
+            .join(ForecastModel, and_(
+                ForecastModel.material_id == MaterialStock.material_id,
+                ForecastModel.is_latest.is_(True)
+            ))
+            .join(StoredForecastPoint, and_(
+                StoredForecastPoint.material_id == ForecastModel.material_id,
+                StoredForecastPoint.version == ForecastModel.version
+            ))
+            .where(StoredForecastPoint.ds >= start, StoredForecastPoint.ds < end)
+            .group_by(MaterialStock.id, MaterialStock.material_id)
+        )
+        if material_ids:
+            query = query.where(MaterialStock.material_id.in_(material_ids))
+        result = await self.db.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def set_reorder_points(self, rows: List[Dict[str, Any]]) -> None:
+        """{"id", "reorder_point"} satırlarını birincil anahtarla toplu günceller (commit etmez)"""
+        if rows:
+            await self.db.execute(update(MaterialStock), rows)
+
+    async def create_stock_history(
         self,
         material_id: str,
         quantity_change: float,
@@ -80,19 +618,41 @@ class InventoryRepository:
             notes=notes
         )
         self.db.add(history)
-        self.db.commit()
-        self.db.refresh(history)
+        await self.db.commit()
+        await self.db.refresh(history)
         return history
 
-    def get_stock_history(
+    async def get_first_movements(self, material_id: str, since: datetime) -> List[StockHistory]:
+        """since sonrasındaki ilk miktar ve ilk rezerv hareketi (varsa)"""
+        movements = []
+        for is_reserved in (False, True):
+            result = await self.db.execute(
+                select(StockHistory).where(
+                    StockHistory.material_id == material_id,
+                    StockHistory.is_reserved.is_(is_reserved),
+                    StockHistory.created_at >= since
+                ).order_by(StockHistory.created_at, StockHistory.id).limit(1)
+            )
+            movement = result.scalars().first()
+            if movement is not None:
+                movements.append(movement)
+        return movements
+
+    async def get_stock_history(
         self,
         material_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        descending: bool = False
     ) -> List[StockHistory]:
         """Belirli bir tarih aralığındaki stok hareketlerini getirir"""
-        return self.db.query(StockHistory).filter(
-            StockHistory.material_id == material_id,
-            StockHistory.created_at >= start_date,
-            StockHistory.created_at <= end_date
-        ).order_by(StockHistory.created_at.asc()).all()
+        order = (StockHistory.created_at.desc(), StockHistory.id.desc()) if descending \
+            else (StockHistory.created_at.asc(), StockHistory.id.asc())
+        result = await self.db.execute(
+            select(StockHistory).where(
+                StockHistory.material_id == material_id,
+                StockHistory.created_at >= start_date,
+                StockHistory.created_at <= end_date
+            ).order_by(*order)
+        )
+        return list(result.scalars().all())
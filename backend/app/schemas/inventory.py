@@ -19,6 +19,10 @@ class InventoryLevel(BaseModel):
 class InventoryAlert(BaseModel):
     material_id: str
     alert_type: str
-    threshold: int
-    current_level: int
+    threshold: float
+    current_level: float
     created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,261 @@
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.forecast import (
+    is_eligible_for_training, hash_series, needs_retraining, new_model_version
+)
+
+logger = logging.getLogger(__name__)
+
+METHOD_MOVING_AVERAGE = "moving_average"
+METHOD_EXPONENTIAL_SMOOTHING = "exponential_smoothing"
+METHOD_CROSTON = "croston"
+
+MOVING_AVERAGE_WINDOW = 4
+# Bu uzunluğun altındaki serilerde üstel düzeltme yerine hareketli ortalama kullanılır
+MIN_SMOOTHING_POINTS = 8
+INTERVAL_Z = 1.96
+
+
+def route_materials(prepared_data: Dict[str, Any], material_ids: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Malzemeleri Prophet ve baseline motorları arasında paylaştırır.
+    Prophet yalnızca yeterince uzun ve değişken seriler için kullanılır.
+    """
+    prophet_ids, baseline_ids = [], []
+    for material_id in (material_ids if material_ids is not None else prepared_data):
+        stats = prepared_data[material_id]["stats"]
+        mean = abs(stats["mean"]) or np.nan
+        variation = stats["std"] / mean if stats["std"] == stats["std"] else 0.0
+        if (
+            is_eligible_for_training(stats)
+            and stats["count"] >= settings.FORECAST_PROPHET_MIN_POINTS
+            and variation >= settings.FORECAST_PROPHET_MIN_CV
+        ):
+            prophet_ids.append(material_id)
+        else:
+            baseline_ids.append(material_id)
+    return prophet_ids, baseline_ids
+
+
+def build_series_matrix(
+    prepared_data: Dict[str, Any],
+    material_ids: List[str]
+) -> Tuple[np.ndarray, np.ndarray, List[pd.Timestamp]]:
+    """
+    Serileri sağa hizalı (son gözlem son sütunda) ve NaN ile doldurulmuş
+    tek bir (malzeme x zaman) matrisine dönüştürür.
+    """
+    series = [prepared_data[m]["data"]["y"].to_numpy(dtype=float) for m in material_ids]
+    lengths = np.array([len(s) for s in series], dtype=int)
+    values = np.full((len(series), lengths.max(initial=0)), np.nan)
+    for row, s in enumerate(series):
+        if len(s):
+            values[row, -len(s):] = s
+    last_dates = [prepared_data[m]["data"]["ds"].iloc[-1] for m in material_ids]
+    return values, lengths, last_dates
+
+
+def moving_average(values: np.ndarray, window: int = MOVING_AVERAGE_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """Son window gözlemin ortalaması ve bir adım ileri hata std'si"""
+    tail = values[:, -window:]
+    level = np.nanmean(tail, axis=1)
+    errors = values[:, 1:] - _rolling_nanmean(values, window)[:, :-1]
+    return level, _rmse(errors)
+
+
+def exponential_smoothing(values: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Basit üstel düzeltme; zaman üzerinde döngü, malzemeler üzerinde vektörel"""
+    n_rows, n_cols = values.shape
+    level = np.full(n_rows, np.nan)
+    sq_error = np.zeros(n_rows)
+    n_error = np.zeros(n_rows)
+    for t in range(n_cols):
+        x = values[:, t]
+        observed = ~np.isnan(x)
+        has_level = ~np.isnan(level)
+
+        step = observed & has_level
+        error = np.where(step, x - level, 0.0)
+        sq_error += error ** 2
+        n_error += step
+
+        level = np.where(step, level + alpha * error, level)
+        level = np.where(observed & ~has_level, x, level)
+    return level, np.sqrt(np.divide(sq_error, n_error, out=np.zeros(n_rows), where=n_error > 0))
+
+
+def croston(values: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aralıklı talep için Croston (SBA düzeltmeli); talep büyüklüğü ve
+    talepler arası aralık ayrı ayrı düzeltilir.
+    """
+    n_rows, n_cols = values.shape
+    size = np.full(n_rows, np.nan)
+    interval = np.full(n_rows, np.nan)
+    periods_since = np.ones(n_rows)
+    sq_error = np.zeros(n_rows)
+    n_error = np.zeros(n_rows)
+    for t in range(n_cols):
+        x = values[:, t]
+        observed = ~np.isnan(x)
+        demand = observed & (x > 0)
+        initialized = ~np.isnan(size)
+
+        estimate = np.where(initialized, size / interval, np.nan)
+        step = observed & initialized
+        error = np.where(step, x - estimate, 0.0)
+        sq_error += error ** 2
+        n_error += step
+
+        update = demand & initialized
+        size = np.where(update, size + alpha * (x - size), size)
+        interval = np.where(update, interval + alpha * (periods_since - interval), interval)
+
+        first = demand & ~initialized
+        size = np.where(first, x, size)
+        interval = np.where(first, periods_since, interval)
+
+        periods_since = np.where(demand, 1.0, periods_since + observed)
+    level = (1 - alpha / 2) * np.divide(size, interval, out=np.zeros(n_rows), where=interval > 0)
+    level = np.where(np.isnan(size), 0.0, level)
+    return level, np.sqrt(np.divide(sq_error, n_error, out=np.zeros(n_rows), where=n_error > 0))
+
+
+def _rolling_nanmean(values: np.ndarray, window: int) -> np.ndarray:
+    filled = np.nan_to_num(values)
+    counts = (~np.isnan(values)).astype(float)
+    csum = np.cumsum(filled, axis=1)
+    ccount = np.cumsum(counts, axis=1)
+    csum[:, window:] = csum[:, window:] - csum[:, :-window]
+    ccount[:, window:] = ccount[:, window:] - ccount[:, :-window]
+    return np.divide(csum, ccount, out=np.full(values.shape, np.nan), where=ccount > 0)
+
+
+def _rmse(errors: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(errors)
+    n = valid.sum(axis=1)
+    sq = np.where(valid, errors, 0.0) ** 2
+    return np.sqrt(np.divide(sq.sum(axis=1), n, out=np.zeros(len(errors)), where=n > 0))
+
+
+def forecast_baseline_batch(
+    prepared_data: Dict[str, Any],
+    material_ids: List[str],
+    horizon: Optional[int] = None,
+    alpha: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Tüm malzemeler için tek seferde vektörel baseline tahmini üretir.
+    Aralıklı seriler Croston, kısa seriler hareketli ortalama, diğerleri
+    üstel düzeltme ile tahmin edilir. {material_id: sonuç} döner.
+    """
+    if not material_ids:
+        return {}
+    horizon = horizon or settings.FORECAST_BASELINE_HORIZON
+    alpha = alpha or settings.FORECAST_BASELINE_ALPHA
+
+    values, lengths, last_dates = build_series_matrix(prepared_data, material_ids)
+    observed = ~np.isnan(values)
+    zero_share = np.divide(
+        ((values == 0) & observed).sum(axis=1), lengths,
+        out=np.zeros(len(lengths)), where=lengths > 0)
+
+    methods = np.where(
+        zero_share >= settings.FORECAST_INTERMITTENT_ZERO_SHARE,
+        METHOD_CROSTON,
+        np.where(lengths < MIN_SMOOTHING_POINTS,
+                 METHOD_MOVING_AVERAGE, METHOD_EXPONENTIAL_SMOOTHING)
+    )
+
+    level = np.zeros(len(material_ids))
+    rmse = np.zeros(len(material_ids))
+    for method, engine in (
+        (METHOD_MOVING_AVERAGE, lambda v: moving_average(v)),
+        (METHOD_EXPONENTIAL_SMOOTHING, lambda v: exponential_smoothing(v, alpha)),
+        (METHOD_CROSTON, lambda v: croston(v, alpha)),
+    ):
+        mask = methods == method
+        if mask.any():
+            level[mask], rmse[mask] = engine(values[mask])
+
+    lower = np.maximum(level - INTERVAL_Z * rmse, 0.0)
+    upper = level + INTERVAL_Z * rmse
+    steps = pd.to_timedelta(np.arange(1, horizon + 1) * 7, unit="D")
+    version = new_model_version()
+
+    results = {}
+    for i, material_id in enumerate(material_ids):
+        dates = pd.Timestamp(last_dates[i]) + steps
+        results[material_id] = {
+            "material_id": material_id,
+            "version": version,
+            "method": str(methods[i]),
+            "metrics": {"rmse": float(rmse[i]), "method": str(methods[i])},
+            "training_size": int(lengths[i]),
+            "forecast": [
+                {"ds": ds, "yhat": float(level[i]),
+                 "yhat_lower": float(lower[i]), "yhat_upper": float(upper[i])}
+                for ds in dates
+            ]
+        }
+
+    counts = pd.Series(methods).value_counts().to_dict()
+    logger.info(f"Baseline forecasts for {len(material_ids)} materials: {counts}")
+    return results
+
+
+def run_baseline_batch(
+    prepared_data: Dict[str, Any],
+    material_ids: List[str],
+    manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+    ttl_days: Optional[int] = None,
+    result_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Baseline'a yönlendirilen malzemeleri tahmin eder ve train_materials_batch
+    ile aynı biçimde sonuç satırları döner. manifest verilirse serisi
+    değişmemiş malzemeler atlanır.
+    """
+    rows: List[Dict[str, Any]] = []
+    data_hashes = {m: hash_series(prepared_data[m]["data"]) for m in material_ids}
+    if manifest is not None:
+        stale = []
+        for material_id in material_ids:
+            if needs_retraining(data_hashes[material_id], manifest.get(material_id), ttl_days) is None:
+                rows.append({"material_id": material_id, "status": "unchanged",
+                             "data_hash": data_hashes[material_id], "error": None})
+            else:
+                stale.append(material_id)
+        material_ids = stale
+
+    started = datetime.now()
+    results = forecast_baseline_batch(prepared_data, material_ids)
+    duration = (datetime.now() - started).total_seconds() / max(len(material_ids), 1)
+
+    for material_id, result in results.items():
+        result["data_hash"] = data_hashes[material_id]
+        row = {
+            "material_id": material_id,
+            "status": "baseline",
+            "method": result["method"],
+            "version": result["version"],
+            "data_hash": result["data_hash"],
+            "training_size": result["training_size"],
+            "cv_rmse": result["metrics"]["rmse"],
+            "duration_seconds": duration,
+            "error": None
+        }
+        if result_callback:
+            try:
+                result_callback(result)
+            except Exception as e:
+                logger.error(f"Result callback failed for material {material_id}: {e}")
+                row.update(status="failed", error=str(e))
+        rows.append(row)
+    return rows
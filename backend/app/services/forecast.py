@@ -0,0 +1,546 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import logging
+from datetime import datetime, timedelta, timezone
+import joblib
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from prophet import Prophet
+from prophet.diagnostics import cross_validation, performance_metrics, generate_cutoffs
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+import gc
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+from app.core.config import settings
+from app.services.prepared_data import PreparedDataStore, MANIFEST_PATTERN
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+OUTPUT_DIR = BASE_DIR / "output"
+PREPARED_DATA_DIR = OUTPUT_DIR / "prepared_data"
+MODEL_DIR = OUTPUT_DIR / "models"
+TRAINING_RUNS_DIR = OUTPUT_DIR / "training_runs"
+MODEL_DIR.mkdir(parents=True, exist_ok=True)
+
+MIN_TRAINING_POINTS = 30
+TRAIN_SPLIT_RATIO = 0.8
+
+CV_INITIAL = '180 days'
+CV_PERIOD = '30 days'
+CV_HORIZON = '90 days'
+
+VALIDATION_FULL = "full"
+VALIDATION_REDUCED = "reduced"
+VALIDATION_HOLDOUT = "holdout"
+VALIDATION_NONE = "none"
+VALIDATION_MODES = (VALIDATION_FULL, VALIDATION_REDUCED,
+                    VALIDATION_HOLDOUT, VALIDATION_NONE)
+
+
+def get_latest_prepared_data():
+    """
+    En son hazırlanmış veri setini bulur (sütunsal manifest ya da eski pickle)
+    """
+    prepared_files = list(PREPARED_DATA_DIR.glob("prepared_data_*.pkl")) + \
+        list(PREPARED_DATA_DIR.glob(MANIFEST_PATTERN))
+    if not prepared_files:
+        raise FileNotFoundError("No prepared data files found")
+    return max(prepared_files, key=lambda x: x.stat().st_mtime)
+
+
+def load_prepared_data(data_file: Optional[Path] = None):
+    """
+    Hazırlanmış veriyi {material_id: {"data", "stats"}} arayüzüyle yükler.
+    Sütunsal depoda seriler yalnızca erişildiğinde okunur.
+    """
+    data_file = data_file or get_latest_prepared_data()
+    if data_file.suffix == ".feather":
+        return PreparedDataStore.from_manifest(data_file)
+    return joblib.load(data_file)
+
+
+def split_train_validation(material_data: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Seriyi eğitim ve doğrulama kısımlarına ayırır
+    """
+    train_size = int(len(material_data) * TRAIN_SPLIT_RATIO)
+    return material_data.iloc[:train_size], material_data.iloc[train_size:]
+
+
+def _cross_validate(
+    model: Prophet,
+    validation_mode: str,
+    max_cutoffs: Optional[int],
+    cv_parallel: Optional[str]
+) -> pd.DataFrame:
+    """
+    Seçilen stratejiye göre Prophet cross-validation çalıştırır.
+    "reduced" modunda yalnızca en yeni max_cutoffs kesim noktası kullanılır.
+    """
+    cutoffs = None
+    if validation_mode == VALIDATION_REDUCED:
+        cutoffs = generate_cutoffs(
+            model.history.copy(),
+            pd.Timedelta(CV_HORIZON),
+            pd.Timedelta(CV_INITIAL),
+            pd.Timedelta(CV_PERIOD)
+        )
+        cutoffs = cutoffs[-max(max_cutoffs or 1, 1):]
+
+    df_cv = cross_validation(
+        model,
+        initial=CV_INITIAL,
+        period=CV_PERIOD,
+        horizon=CV_HORIZON,
+        cutoffs=cutoffs,
+        parallel=cv_parallel
+    )
+    return performance_metrics(df_cv)
+
+
+def train_prophet_model(
+    train_df: pd.DataFrame,
+    material_id: str,
+    validation_df: pd.DataFrame = None,
+    cv_parallel: Optional[str] = "processes",
+    validation_mode: Optional[str] = None,
+    max_cutoffs: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Prophet modelini eğitir ve değerlendirir.
+    validation_mode: "full" (tüm kesimlerle CV), "reduced" (en yeni max_cutoffs
+    kesimle CV), "holdout" (yalnızca doğrulama seti) veya "none" (değerlendirme yok).
+    """
+    validation_mode = validation_mode or settings.FORECAST_VALIDATION_MODE
+    if validation_mode not in VALIDATION_MODES:
+        raise ValueError(f"Unknown validation mode: {validation_mode}")
+    if max_cutoffs is None:
+        max_cutoffs = settings.FORECAST_CV_MAX_CUTOFFS
+
+    try:
+        logger.info(
+            f"Training model for material {material_id} (validation={validation_mode})")
+
+        # Veri kontrolü
+        if len(train_df) < MIN_TRAINING_POINTS:
+            raise ValueError(
+                f"Insufficient data points for material {material_id}")
+
+        if train_df["y"].std() <= 0.0:
+            logger.warning(
+                f"Material {material_id} has zero variance. Adding minimal noise to proceed.")
+            train_df = train_df.copy()
+            train_df["y"] += np.random.normal(0, 0.001, size=len(train_df))
+
+        # Model parametreleri
+        model = Prophet(
+            yearly_seasonality=True,
+            weekly_seasonality=True,
+            daily_seasonality=False,
+            changepoint_prior_scale=0.1,
+            seasonality_prior_scale=10.0,
+            seasonality_mode='multiplicative',
+            changepoint_range=0.95,
+            interval_width=0.95,
+            growth='linear'
+        )
+
+        model.add_country_holidays(country_name='TR')
+
+        # Model eğitimi
+        model.fit(train_df)
+
+        # Cross-validation
+        df_p = None
+        if validation_mode in (VALIDATION_FULL, VALIDATION_REDUCED):
+            df_p = _cross_validate(
+                model, validation_mode, max_cutoffs, cv_parallel)
+
+        # Tahmin sonuçları
+        future = model.make_future_dataframe(periods=90, freq='W')
+        forecast = model.predict(future)
+
+        # Align validation data with forecast
+        val_metrics = None
+        if validation_df is not None and validation_mode != VALIDATION_NONE:
+            logger.info("Aligning validation data with forecast...")
+            aligned_val_df = validation_df[validation_df['ds'].isin(
+                forecast['ds'])]
+
+            if aligned_val_df.empty:
+                raise ValueError(
+                    f"Validation data for material {material_id} does not align with forecast dates.")
+
+            val_forecast = forecast[forecast['ds'].isin(aligned_val_df['ds'])]
+            val_metrics = {
+                "rmse": float(np.sqrt(mean_squared_error(aligned_val_df["y"], val_forecast["yhat"]))),
+                "mae": float(mean_absolute_error(aligned_val_df["y"], val_forecast["yhat"])),
+                "r2": float(r2_score(aligned_val_df["y"], val_forecast["yhat"]))
+            }
+            if validation_mode == VALIDATION_HOLDOUT:
+                y_true = aligned_val_df["y"].to_numpy()
+                inside = (y_true >= val_forecast["yhat_lower"].to_numpy()) & \
+                    (y_true <= val_forecast["yhat_upper"].to_numpy())
+                val_metrics["coverage"] = float(inside.mean())
+
+        forecast_std = forecast["yhat"].std()
+        if forecast_std < 0.01:
+            logger.warning(
+                f"Low forecast variance for material {material_id}: {forecast_std}")
+
+        version = new_model_version()
+        model_path = MODEL_DIR / f"{material_id}_model_{version}.pkl"
+        with open(model_path, "wb") as f:
+            joblib.dump(model, f)
+
+        if df_p is not None:
+            metrics = {
+                "rmse": float(df_p["rmse"].mean()),
+                "mae": float(df_p["mae"].mean()),
+                "mape": float(df_p["mape"].mean()) if "mape" in df_p.columns else None,
+                "coverage": float(df_p["coverage"].mean())
+            }
+        elif validation_mode == VALIDATION_HOLDOUT and val_metrics:
+            metrics = {
+                "rmse": val_metrics["rmse"],
+                "mae": val_metrics["mae"],
+                "mape": None,
+                "coverage": val_metrics["coverage"]
+            }
+        else:
+            metrics = {"rmse": None, "mae": None, "mape": None, "coverage": None}
+
+        return {
+            "material_id": material_id,
+            "version": version,
+            "model_path": str(model_path),
+            "validation_mode": validation_mode,
+            "metrics": metrics,
+            "validation_metrics": val_metrics,
+            "forecast": forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].to_dict(orient="records"),
+            "cross_validation_metrics": df_p.to_dict(orient="records") if df_p is not None else [],
+            "training_size": len(train_df)
+        }
+
+    except Exception as e:
+        logger.error(
+            f"Error in model training for material {material_id}: {e}")
+        raise
+    finally:
+        gc.collect()
+
+
+def train_best_material(
+    prepared_data: Dict[str, Any],
+    validation_mode: Optional[str] = None,
+    max_cutoffs: Optional[int] = None,
+    cv_parallel: Optional[str] = "processes"
+) -> Dict[str, Any]:
+    """
+    En fazla veri noktasına sahip malzeme için tek bir model eğitir.
+    cv_parallel, cross-validation paralelliğidir (train_prophet_model).
+    """
+    best_material, max_data_points = select_best_material(prepared_data)
+    if not best_material:
+        raise LookupError(
+            f"No suitable material found. Total materials: {len(prepared_data)}")
+
+    logger.info(
+        f"Selected material {best_material} with {max_data_points} data points")
+
+    train_df, val_df = split_train_validation(
+        prepared_data[best_material]["data"])
+    result = train_prophet_model(
+        train_df,
+        best_material,
+        val_df,
+        validation_mode=validation_mode,
+        max_cutoffs=max_cutoffs,
+        cv_parallel=cv_parallel
+    )
+    return {"statistics": prepared_data[best_material]["stats"], **result}
+
+
+def select_best_material(prepared_data: Dict[str, Any]) -> Tuple[Optional[str], int]:
+    """
+    En fazla veri noktasına sahip malzemeyi seçer
+    """
+    best_material = None
+    max_data_points = 0
+
+    for material_id, data in prepared_data.items():
+        count = data["stats"]["count"]
+        std = data["stats"]["std"]
+
+        logger.info(
+            f"Evaluating material {material_id}: count={count}, std={std}")
+
+        if count >= 5:  # Allow materials with fewer data points
+            if std <= 0.0:
+                logger.warning(
+                    f"Material {material_id} has zero variance but is being considered.")
+            if count > max_data_points:
+                best_material = material_id
+                max_data_points = count
+
+    return best_material, max_data_points
+
+
+def new_model_version() -> str:
+    """
+    Zaman damgalı model sürümü. Mikrosaniye çözünürlüğü aynı saniyede
+    yapılan eğitimlerin (material_id, version) çakışmasını önler; sabit
+    genişlik sayesinde metin sıralaması zaman sırasıyla aynıdır.
+    """
+    return datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+
+
+def is_eligible_for_training(stats: Dict[str, Any]) -> bool:
+    """
+    Eğitim bölümünün Prophet için yeterli veri içerip içermediğini kontrol eder
+    """
+    return int(stats["count"] * TRAIN_SPLIT_RATIO) >= MIN_TRAINING_POINTS
+
+
+def hash_series(material_data: pd.DataFrame) -> str:
+    """
+    Malzeme serisinin (ds, y) içerik özetini hesaplar
+    """
+    row_hashes = pd.util.hash_pandas_object(
+        material_data[["ds", "y"]], index=False)
+    return hashlib.sha256(row_hashes.values.tobytes()).hexdigest()
+
+
+def needs_retraining(
+    data_hash: str,
+    manifest_entry: Optional[Dict[str, Any]],
+    ttl_days: Optional[int]
+) -> Optional[str]:
+    """
+    Yeniden eğitim gerekçesini döner; model güncelse None döner
+    """
+    if manifest_entry is None:
+        return "new"
+    if manifest_entry.get("data_hash") != data_hash:
+        return "changed"
+    trained_at = manifest_entry.get("trained_at")
+    if ttl_days is not None and trained_at is not None:
+        if trained_at.tzinfo is None:
+            trained_at = trained_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - trained_at > timedelta(days=ttl_days):
+            return "expired"
+    return None
+
+
+def _limit_worker_memory(max_memory_mb: Optional[int]) -> None:
+    """
+    Worker sürecinin adres alanını (RLIMIT_AS) sınırlar, yalnızca POSIX.
+    Bu sanal bellek sınırıdır, RSS değil: eşlenmiş ama kullanılmayan bellek
+    de sayıldığından değer gerçek bellek ihtiyacının üzerinde seçilmelidir.
+    Aşıldığında ayırma MemoryError ile başarısız olur ve malzeme hatalı işaretlenir.
+    """
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Worker memory limit is not supported on this platform")
+        return
+
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _train_material_worker(
+    material_id: str,
+    material_data: pd.DataFrame,
+    data_hash: Optional[str] = None,
+    validation_mode: Optional[str] = None,
+    max_cutoffs: Optional[int] = None,
+    cv_parallel: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Worker sürecinde tek bir malzeme için model eğitir ve özet sonucu döner
+    """
+    started = datetime.now()
+    try:
+        train_df, val_df = split_train_validation(material_data)
+        result = train_prophet_model(
+            train_df,
+            material_id,
+            val_df,
+            cv_parallel=cv_parallel,
+            validation_mode=validation_mode,
+            max_cutoffs=max_cutoffs
+        )
+        val_metrics = result["validation_metrics"] or {}
+        return {
+            "material_id": material_id,
+            "status": "trained",
+            "version": result["version"],
+            "data_hash": data_hash,
+            "model_path": result["model_path"],
+            "training_size": result["training_size"],
+            **{f"cv_{k}": v for k, v in result["metrics"].items()},
+            **{f"val_{k}": v for k, v in val_metrics.items()},
+            "duration_seconds": (datetime.now() - started).total_seconds(),
+            "error": None,
+            "forecast": result["forecast"]
+        }
+    except MemoryError:
+        return {
+            "material_id": material_id,
+            "status": "failed",
+            "duration_seconds": (datetime.now() - started).total_seconds(),
+            "error": "Worker memory limit exceeded"
+        }
+    except Exception as e:
+        return {
+            "material_id": material_id,
+            "status": "failed",
+            "duration_seconds": (datetime.now() - started).total_seconds(),
+            "error": str(e)
+        }
+
+
+def train_materials_batch(
+    prepared_data: Dict[str, Any],
+    max_workers: Optional[int] = None,
+    max_memory_mb: Optional[int] = None,
+    material_ids: Optional[List[str]] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    result_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+    ttl_days: Optional[int] = None,
+    validation_mode: Optional[str] = None,
+    max_cutoffs: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Uygun tüm malzemeler için Prophet modellerini süreç havuzunda eğitir.
+    Her malzeme için bir satır içeren sonuç/metrik tablosu döner.
+    progress_callback verilirse her malzeme bittiğinde (tamamlanan, toplam) ile,
+    result_callback verilirse başarıyla eğitilen her malzemenin satırıyla
+    (tahmin kayıtları "forecast" anahtarında) çağrılır.
+    manifest verilirse ({material_id: {"data_hash", "trained_at"}}) serisi
+    değişmemiş ve modeli ttl_days'ten yeni olan malzemeler atlanır.
+    Dış havuz zaten paralel olduğundan cross-validation varsayılan olarak
+    worker içinde sıralı çalışır (FORECAST_BATCH_CV_PARALLEL).
+    """
+    max_workers = max_workers or settings.FORECAST_MAX_WORKERS or os.cpu_count() or 1
+    if max_memory_mb is None:
+        max_memory_mb = settings.FORECAST_WORKER_MAX_MEMORY_MB
+
+    candidates = material_ids if material_ids is not None else list(prepared_data)
+
+    rows: List[Dict[str, Any]] = []
+    eligible: List[str] = []
+    for material_id in candidates:
+        if material_id not in prepared_data:
+            rows.append({"material_id": material_id, "status": "skipped",
+                         "error": "Material not found in prepared data"})
+        elif not is_eligible_for_training(prepared_data[material_id]["stats"]):
+            rows.append({"material_id": material_id, "status": "skipped",
+                         "error": "Insufficient data points for Prophet"})
+        else:
+            eligible.append(material_id)
+
+    logger.info(
+        f"Batch training {len(eligible)} of {len(candidates)} materials with {max_workers} workers")
+
+    total = len(candidates)
+    if progress_callback:
+        progress_callback(len(rows), total)
+
+    def collect(future, material_id: str) -> None:
+        try:
+            row = future.result()
+        except Exception as e:
+            # Worker süreci çöktüyse (ör. bellek limiti) havuz hatası buraya düşer
+            row = {"material_id": material_id,
+                   "status": "failed", "error": str(e)}
+        if result_callback and row["status"] == "trained":
+            try:
+                result_callback(row)
+            except Exception as e:
+                logger.error(
+                    f"Result callback failed for material {material_id}: {e}")
+                row = {**row, "status": "failed", "error": str(e)}
+        # Tahmin kayıtları sonuç tablosuna alınmaz
+        row.pop("forecast", None)
+        rows.append(row)
+        logger.info(
+            f"Material {material_id} finished with status {row['status']}")
+        if progress_callback:
+            progress_callback(len(rows), total)
+
+    if eligible:
+        unchanged = 0
+        # Seriler gönderim anında okunup özetlenir; bekleyen görev sayısı
+        # sınırlı tutulduğundan depo bütünüyle belleğe alınmaz.
+        max_pending = max_workers * 2
+        # Prophet/Stan süreç içinde bellek biriktirdiği için worker'lar belirli
+        # sayıda görevden sonra yenilenir; bu "fork" ile uyumsuz olduğundan spawn kullanılır.
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(eligible)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_limit_worker_memory,
+            initargs=(max_memory_mb,),
+            max_tasks_per_child=settings.FORECAST_WORKER_MAX_TASKS
+        ) as executor:
+            pending: Dict[Any, str] = {}
+            for material_id in eligible:
+                material_data = prepared_data[material_id]["data"]
+                data_hash = hash_series(material_data)
+                if manifest is not None and needs_retraining(
+                        data_hash, manifest.get(material_id), ttl_days) is None:
+                    unchanged += 1
+                    rows.append({"material_id": material_id, "status": "unchanged",
+                                 "data_hash": data_hash, "error": None})
+                    if progress_callback:
+                        progress_callback(len(rows), total)
+                    continue
+
+                while len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+                future = executor.submit(
+                    _train_material_worker,
+                    material_id,
+                    material_data,
+                    data_hash,
+                    validation_mode,
+                    max_cutoffs,
+                    settings.FORECAST_BATCH_CV_PARALLEL
+                )
+                pending[future] = material_id
+
+            for future in as_completed(pending):
+                collect(future, pending[future])
+
+        if manifest is not None:
+            logger.info(
+                f"Incremental run: {len(eligible) - unchanged} of {len(eligible)} "
+                f"eligible materials needed retraining")
+
+    results = pd.DataFrame(rows)
+    for column in ("model_path", "training_size", "duration_seconds"):
+        if column not in results.columns:
+            results[column] = None
+    return results
+
+
+def save_training_results(results: pd.DataFrame) -> Path:
+    """
+    Toplu eğitim sonuç tablosunu CSV olarak kaydeder
+    """
+    TRAINING_RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = TRAINING_RUNS_DIR / \
+        f"training_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    results.to_csv(results_file, index=False)
+    logger.info(f"Saved batch training results to: {results_file}")
+    return results_file
@@ -0,0 +1,317 @@
+import logging
+import math
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.forecast import (
+    TrainingJob,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED
+)
+from app.repositories.forecast import TrainingJobRepository
+from app.services.model_registry import ModelRegistry
+from app.services.forecast_store import ForecastStore
+from app.services.baseline_forecast import route_materials, run_baseline_batch
+from app.services.forecast import (
+    get_latest_prepared_data,
+    load_prepared_data,
+    hash_series,
+    train_best_material,
+    train_materials_batch,
+    save_training_results
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE_SINGLE = "single"
+JOB_TYPE_BATCH = "batch"
+
+
+def _json_safe(value: Any) -> Any:
+    """JSON sütununa yazılamayan NaN/inf değerlerini None'a çevirir"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+class TrainingJobManager:
+    """
+    Eğitim işlerini yerel bir worker havuzunda çalıştırır ve durumlarını
+    training_jobs tablosunda saklar. Her iş onu çalıştıran sürecin kimliğini
+    taşır; süreç işlerinin canlılık zamanını düzenli olarak günceller.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.FORECAST_JOB_WORKERS
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="training-job"
+                )
+            return self._executor
+
+    def submit(self, db: Session, job_type: str, params: Dict[str, Any]) -> TrainingJob:
+        """Yeni bir eğitim işi oluşturur ve kuyruğa alır"""
+        repository = TrainingJobRepository(db)
+        job = repository.create(TrainingJob(
+            id=uuid.uuid4().hex,
+            job_type=job_type,
+            status=JOB_STATUS_QUEUED,
+            progress=0,
+            completed_items=0,
+            params=params,
+            worker_id=self.worker_id,
+            heartbeat_at=datetime.now(timezone.utc)
+        ))
+        self.executor.submit(self._run, job.id)
+        logger.info(f"Queued {job_type} training job {job.id}")
+        return job
+
+    def recover(self) -> None:
+        """
+        Açılışta sahibi çalışmayan yarım işleri kapatır ve canlılık
+        güncellemesini başlatır. Diğer süreçlerin (çok worker'lı kurulum,
+        kademeli yeniden başlatma) canlı işlerine dokunulmaz.
+        """
+        self._fail_stale()
+        with self._lock:
+            if self._heartbeat is None:
+                self._stopped.clear()
+                self._heartbeat = threading.Thread(
+                    target=self._heartbeat_loop, name="training-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def _fail_stale(self) -> None:
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.FORECAST_JOB_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            count = TrainingJobRepository(db).fail_stale(
+                stale_before, "Interrupted: worker process stopped")
+            if count:
+                logger.warning(f"Marked {count} interrupted training jobs as failed")
+        except Exception as e:
+            logger.error(f"Stale training job check failed: {e}")
+        finally:
+            db.close()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stopped.wait(settings.FORECAST_JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                TrainingJobRepository(db).touch(self.worker_id, datetime.now(timezone.utc))
+            except Exception as e:
+                logger.error(f"Training job heartbeat failed: {e}")
+            finally:
+                db.close()
+            # Çöken süreçlerin işleri yeniden başlatma beklenmeden kapanır
+            self._fail_stale()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        with self._lock:
+            self._heartbeat = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _update(self, job_id: str, **fields) -> None:
+        db = SessionLocal()
+        try:
+            repository = TrainingJobRepository(db)
+            job = repository.get(job_id)
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            repository.update(job)
+        finally:
+            db.close()
+
+    def _progress(self, job_id: str, completed: int, total: int) -> None:
+        self._update(
+            job_id,
+            completed_items=completed,
+            total_items=total,
+            progress=completed / total if total else 1.0
+        )
+
+    def _run(self, job_id: str) -> None:
+        db = SessionLocal()
+        try:
+            job = TrainingJobRepository(db).get(job_id)
+            if job is None:
+                logger.error(f"Training job {job_id} disappeared before start")
+                return
+            job_type, params = job.job_type, dict(job.params or {})
+        finally:
+            db.close()
+
+        self._update(job_id, status=JOB_STATUS_RUNNING,
+                     started_at=datetime.now(timezone.utc))
+        try:
+            data_file = get_latest_prepared_data()
+            prepared_data = load_prepared_data(data_file)
+            logger.info(
+                f"Job {job_id}: {len(prepared_data)} materials in {data_file.name}")
+
+            registry_db = SessionLocal()
+            try:
+                registry = ModelRegistry(registry_db)
+                store = ForecastStore(registry_db)
+                if job_type == JOB_TYPE_BATCH:
+                    result = self._run_batch(
+                        job_id, prepared_data, params, registry, store)
+                else:
+                    self._update(job_id, total_items=1)
+                    result = self._run_single(
+                        prepared_data, params, registry, store)
+            finally:
+                registry_db.close()
+
+            self._update(
+                job_id,
+                status=JOB_STATUS_COMPLETED,
+                progress=1.0,
+                completed_items=result.pop("completed_items", 1),
+                result=_json_safe(jsonable_encoder(result)),
+                finished_at=datetime.now(timezone.utc)
+            )
+            logger.info(f"Training job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Training job {job_id} failed: {e}")
+            self._update(
+                job_id,
+                status=JOB_STATUS_FAILED,
+                error=str(e),
+                finished_at=datetime.now(timezone.utc)
+            )
+
+    def _run_single(
+        self,
+        prepared_data: Dict[str, Any],
+        params: Dict[str, Any],
+        registry: ModelRegistry,
+        store: ForecastStore
+    ) -> Dict[str, Any]:
+        # İş, API sürecindeki iş parçacığı havuzunda çalıştığından CV için
+        # ayrıca süreç havuzu açılmaz
+        result = train_best_material(
+            prepared_data,
+            validation_mode=params.get("validation_mode"),
+            max_cutoffs=params.get("max_cutoffs"),
+            cv_parallel=None
+        )
+        data_hash = hash_series(prepared_data[result["material_id"]]["data"])
+        # Noktalar sürüm "latest" olmadan önce yazılır ki okuyucular boş tahmin görmesin
+        store.save(result["material_id"], result["version"], result["forecast"])
+        registry.register(
+            material_id=result["material_id"],
+            version=result["version"],
+            model_path=result["model_path"],
+            metrics=_json_safe(result["metrics"]),
+            validation_metrics=_json_safe(result["validation_metrics"]),
+            training_size=result["training_size"],
+            data_hash=data_hash
+        )
+        # Tahmin ve CV satırları iş tablosunda tutulmaz
+        result.pop("forecast", None)
+        result.pop("cross_validation_metrics", None)
+        return result
+
+    def _run_batch(
+        self,
+        job_id: str,
+        prepared_data: Dict[str, Any],
+        params: Dict[str, Any],
+        registry: ModelRegistry,
+        store: ForecastStore
+    ) -> Dict[str, Any]:
+        def on_result(row: Dict[str, Any]) -> None:
+            store.save(row["material_id"], row["version"], row["forecast"])
+            registry.register_training_row(
+                _json_safe({k: v for k, v in row.items() if k != "forecast"}))
+
+        def on_baseline(result: Dict[str, Any]) -> None:
+            store.save(result["material_id"], result["version"], result["forecast"])
+            registry.register(
+                material_id=result["material_id"],
+                version=result["version"],
+                model_path=None,
+                metrics=_json_safe(result["metrics"]),
+                training_size=result["training_size"],
+                model_type="baseline",
+                data_hash=result["data_hash"]
+            )
+
+        manifest = None if params.get("force") else registry.training_manifest()
+        ttl_days = params.get("ttl_days", settings.FORECAST_MODEL_TTL_DAYS)
+
+        prophet_ids = None
+        baseline_rows = []
+        if params.get("routing", settings.FORECAST_ROUTING_ENABLED):
+            prophet_ids, baseline_ids = route_materials(prepared_data)
+            logger.info(
+                f"Job {job_id}: routing {len(prophet_ids)} materials to Prophet, {len(baseline_ids)} to baseline")
+            baseline_rows = run_baseline_batch(
+                prepared_data,
+                baseline_ids,
+                manifest=manifest,
+                ttl_days=ttl_days,
+                result_callback=on_baseline
+            )
+        offset = len(baseline_rows)
+
+        results = train_materials_batch(
+            prepared_data,
+            max_workers=params.get("max_workers"),
+            max_memory_mb=params.get("max_memory_mb"),
+            material_ids=prophet_ids,
+            progress_callback=lambda done, total: self._progress(
+                job_id, done + offset, total + offset),
+            result_callback=on_result,
+            manifest=manifest,
+            ttl_days=ttl_days,
+            validation_mode=params.get("validation_mode"),
+            max_cutoffs=params.get("max_cutoffs")
+        )
+        if baseline_rows:
+            results = pd.concat(
+                [pd.DataFrame(baseline_rows), results], ignore_index=True)
+        results_file = save_training_results(results)
+        status_counts = results["status"].value_counts().to_dict()
+        return {
+            "results_file": str(results_file),
+            "summary": {k: int(v) for k, v in status_counts.items()},
+            "completed_items": len(results)
+        }
+
+
+job_manager = TrainingJobManager()
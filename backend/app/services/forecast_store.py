@@ -0,0 +1,74 @@
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.repositories.forecast import ForecastModelRepository, ForecastPointRepository
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ("yhat", "yhat_lower", "yhat_upper")
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class ForecastStore:
+    """
+    Eğitim sırasında üretilen tahminleri saklar; okuma tarafı model hesaplaması yapmaz.
+    """
+
+    def __init__(self, db: Session):
+        self.repository = ForecastPointRepository(db)
+        self.models = ForecastModelRepository(db)
+
+    def save(self, material_id: str, version: str, forecast: List[Dict[str, Any]]) -> int:
+        """Tahmin kayıtlarını (ds, yhat, yhat_lower, yhat_upper) model sürümüyle yazar"""
+        points = [
+            {
+                "ds": pd.Timestamp(record["ds"]).to_pydatetime(),
+                **{column: _to_float(record.get(column)) for column in FORECAST_COLUMNS}
+            }
+            for record in forecast
+        ]
+        points = [point for point in points if point["yhat"] is not None]
+        try:
+            count = self.repository.replace_points(material_id, version, points)
+        except Exception:
+            self.repository.db.rollback()
+            raise
+        logger.info(f"Stored {count} forecast points for {material_id}@{version}")
+        return count
+
+    def read(
+        self,
+        material_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Saklanan tahmini (varsayılan olarak en güncel sürüm) tarih aralığıyla okur"""
+        if version is None:
+            entry = self.models.get_latest(material_id)
+            if not entry:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No forecast found for material {material_id}"
+                )
+            version = entry.version
+
+        points = self.repository.get_points(
+            material_id, version, start_date, end_date)
+        return {
+            "material_id": material_id,
+            "version": version,
+            "forecast": points
+        }
@@ -1,174 +1,542 @@
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from typing import Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List
+
+from app.core.config import settings
 
 from app.models.inventory import (
     MaterialStock,
     MaterialStockCreate,
     MaterialStockUpdate,
+    MaterialStockRead,
+    MaterialStockReadList,
     StockTrendResponse,
     StockHistoryResponse,
-    StockHistory
+    StockHistory,
+    StockAdjustmentItem,
+    StockAdjustmentItemResult,
+    StockAdjustmentBulkResponse,
+    ReorderPointForecastResponse
+)
+from app.schemas.inventory import InventoryAlert
+from app.repositories.inventory import AsyncInventoryRepository
+from app.services.inventory_search import search_index
+from app.services.inventory_cache import inventory_cache
+from app.services.inventory_events import (
+    publish_stock_changes, publish_stock_deleted,
+    STOCK_CREATED, STOCK_UPDATED, STOCK_ADJUSTED
 )
-from app.repositories.inventory import InventoryRepository
+from app.services.stock_snapshots import snapshot_row, build_trend, state_before, today
+
+
+def _not_found(material_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Material stock with id {material_id} not found"
+    )
+
+
+def _apply_update(db_material_stock: MaterialStock, material_stock: MaterialStockUpdate) -> None:
+    """Güncelleme alanlarını ORM nesnesine uygular"""
+    if material_stock.material_description is not None:
+        db_material_stock.material_description = material_stock.material_description
+
+    if material_stock.quantity is not None:
+        db_material_stock.quantity = material_stock.quantity
+        db_material_stock.update_available()
+
+    if material_stock.reserved is not None:
+        try:
+            db_material_stock.reserved = material_stock.reserved
+            db_material_stock.update_available()
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    if material_stock.reorder_point is not None:
+        db_material_stock.reorder_point = material_stock.reorder_point
+
+
+def _adjustment_error(material_stock: MaterialStock, quantity_change: float, is_reserved: bool) -> str:
+    """Veritabanının reddettiği hareket için _apply_adjustment ile aynı hata mesajı"""
+    if not is_reserved:
+        return "Total quantity cannot be less than reserved quantity"
+    if (material_stock.reserved or 0) + quantity_change < 0:
+        return "Reserved quantity cannot be negative"
+    return "Reserved quantity cannot be greater than total quantity"
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+
+def encode_cursor(**position) -> str:
+    """
+    Sayfa konumundan opak imleç üretir: keyset sayfalamada son material_id
+    (m), alaka sıralı aramada sonraki kaydın sırası (o).
+    """
+    payload = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> Any:
+    """İmleçteki alan(lar)ı döner; birden çok anahtar için tuple"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = tuple(payload[key] for key in keys)
+        return values[0] if len(values) == 1 else values
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def encode_history_cursor(record: StockHistory) -> str:
+    return encode_cursor(c=record.created_at.isoformat(), i=record.id)
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    created_at, record_id = decode_cursor(cursor, "c", "i")
+    try:
+        return datetime.fromisoformat(created_at), int(record_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class _CountCache:
+    """
+    Arama terimine göre toplam sayıları kısa süre saklayan önbellek. Anahtarlar
+    istemciden geldiğinden en fazla INVENTORY_COUNT_CACHE_MAX_ITEMS kayıt
+    tutulur; en eski kullanılan kayıt atılır.
+    """
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._items: "OrderedDict[Optional[str], Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, search: Optional[str]) -> Optional[int]:
+        with self._lock:
+            entry = self._items.get(search)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._items[search]
+                return None
+            self._items.move_to_end(search)
+            return entry[1]
+
+    def put(self, search: Optional[str], total: int) -> None:
+        with self._lock:
+            self._items[search] = (
+                time.monotonic() + settings.INVENTORY_COUNT_CACHE_SECONDS, total)
+            self._items.move_to_end(search)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
 
 
-class InventoryService:
-    def __init__(self, db: Session):
-        self.repository = InventoryRepository(db)
+count_cache = _CountCache(settings.INVENTORY_COUNT_CACHE_MAX_ITEMS)
 
-    def create_material_stock(self, material_stock: MaterialStockCreate) -> MaterialStock:
+
+def _apply_adjustment(
+    material_stock: MaterialStock,
+    quantity_change: float,
+    is_reserved: bool
+) -> Tuple[float, float]:
+    """Stok hareketini nesneye uygular; (önceki, yeni) miktarı döner"""
+    if is_reserved:
+        previous_quantity = material_stock.reserved
+        new_reserved = previous_quantity + quantity_change
+        if new_reserved < 0:
+            raise ValueError("Reserved quantity cannot be negative")
+        material_stock.reserved = new_reserved
+        new_value = new_reserved
+    else:
+        previous_quantity = material_stock.quantity
+        new_quantity = previous_quantity + quantity_change
+        if new_quantity < material_stock.reserved:
+            raise ValueError(
+                "Total quantity cannot be less than reserved quantity")
+        material_stock.quantity = new_quantity
+        new_value = new_quantity
+
+    material_stock.update_available()
+    return previous_quantity, new_value
+
+
+class AsyncInventoryService:
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncInventoryRepository(db)
+
+    async def create_material_stock(self, material_stock: MaterialStockCreate) -> MaterialStock:
         try:
             db_material_stock = MaterialStock(
                 material_id=material_stock.material_id,
                 material_description=material_stock.material_description,
                 quantity=material_stock.quantity,
-                reserved=material_stock.reserved
+                reserved=material_stock.reserved,
+                reorder_point=material_stock.reorder_point
             )
-            return self.repository.create(db_material_stock)
+            # Kayıt, gün sonu durumu ve uyarı tek işlemde yazılır
+            created = await self.repository.add(db_material_stock)
+            await self.repository.upsert_daily_snapshots([snapshot_row(created)])
+            await self.repository.refresh_alerts([created.material_id])
+            await self.repository.db.commit()
+            await self.repository.db.refresh(created)
+            search_index.invalidate()
+            await inventory_cache.invalidate([created.material_id])
+            publish_stock_changes(STOCK_CREATED, [created])
+            return created
         except IntegrityError:
+            await self.repository.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Material with ID {material_stock.material_id} already exists"
             )
 
-    def get_material_stock(self, material_id: str) -> MaterialStock:
-        material_stock = self.repository.get_by_material_id(material_id)
+    async def get_material_stock(self, material_id: str) -> MaterialStock:
+        material_stock = await self.repository.get_by_material_id(material_id)
         if not material_stock:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Material stock with id {material_id} not found"
-            )
+            raise _not_found(material_id)
         return material_stock
 
-    def list_material_stocks(
+    async def read_material_stock(self, material_id: str) -> MaterialStockRead:
+        """GET /inventory/{material_id} yanıtı, okuma önbelleği üzerinden"""
+        async def load() -> MaterialStockRead:
+            return MaterialStockRead.model_validate(await self.get_material_stock(material_id))
+        return await inventory_cache.get_stock(material_id, MaterialStockRead, load)
+
+    async def read_material_stocks(
         self,
         skip: int = 0,
         limit: int = 100,
-        search: Optional[str] = None
-    ) -> Tuple[List[MaterialStock], int]:
-        return self.repository.list_stocks(skip, limit, search)
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = COUNT_EXACT
+    ) -> MaterialStockReadList:
+        """GET /inventory sayfası, okuma önbelleği üzerinden"""
+        async def load() -> MaterialStockReadList:
+            items, total, next_cursor = await self.list_material_stocks(
+                skip, limit, search, cursor, count)
+            return MaterialStockReadList(items=items, total=total, next_cursor=next_cursor)
+        params = {"skip": skip, "limit": limit, "search": search, "cursor": cursor, "count": count}
+        return await inventory_cache.get_list(params, MaterialStockReadList, load)
 
-    def update_material_stock(
+    async def list_material_stocks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = COUNT_EXACT
+    ) -> Tuple[List[MaterialStock], Optional[int], Optional[str]]:
+        """
+        Stok sayfasını, toplam sayıyı ve sonraki sayfa imlecini döner.
+        cursor verilirse skip yok sayılır. count: exact (her istekte COUNT),
+        estimate (planlayıcı tahmini ya da önbellekteki sayım), none (sayım yok).
+        """
+        if search:
+            return await self._search_material_stocks(search, skip, limit, cursor, count)
+
+        after = decode_cursor(cursor, "m") if cursor else None
+        # Bir fazla kayıt çekilerek sonraki sayfanın varlığı ek sorgusuz anlaşılır
+        items = await self.repository.list_stocks(skip, limit + 1, None, after)
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(m=items[-1].material_id)
+        return items, await self._count(None, count), next_cursor
+
+    async def _search_material_stocks(
+        self,
+        search: str,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        count: str
+    ) -> Tuple[List[MaterialStock], Optional[int], Optional[str]]:
+        """
+        Alaka sıralı arama. PostgreSQL'de pg_trgm indeksleri, diğer
+        veritabanlarında bellek içi indeks kullanılır.
+        """
+        offset = decode_cursor(cursor, "o") if cursor else skip
+        if self.repository.dialect == "postgresql":
+            items = await self.repository.search_stocks(search, offset, limit + 1)
+            total = await self._count(search, count)
+        else:
+            await search_index.ensure(self.repository)
+            matches = search_index.search(search)
+            items = await self.repository.get_many(matches[offset:offset + limit + 1])
+            total = len(matches) if count != COUNT_NONE else None
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(o=offset + limit)
+        return items, total, next_cursor
+
+    async def _count(self, search: Optional[str], mode: str) -> Optional[int]:
+        if mode == COUNT_NONE:
+            return None
+        if mode == COUNT_ESTIMATE:
+            if not search:
+                estimate = await self.repository.estimate_stock_count()
+                if estimate is not None:
+                    return estimate
+            cached = count_cache.get(search)
+            if cached is not None:
+                return cached
+        total = await self.repository.count_stocks(search)
+        count_cache.put(search, total)
+        return total
+
+    async def update_material_stock(
         self,
         material_id: str,
         material_stock: MaterialStockUpdate
     ) -> MaterialStock:
-        db_material_stock = self.get_material_stock(material_id)
-
+        # Satır kilitlenir; eşzamanlı adjust_stock artırımları hesaplamanın
+        # dayandığı değerleri değiştiremez ve sonucu ezilmez
+        locked = await self.repository.get_many_for_update([material_id])
+        if not locked:
+            raise _not_found(material_id)
+        db_material_stock = locked[0]
+        _apply_update(db_material_stock, material_stock)
+        await self.repository.upsert_daily_snapshots([snapshot_row(db_material_stock)])
+        if material_stock.model_fields_set & {"quantity", "reserved", "reorder_point"}:
+            await self.repository.refresh_alerts([material_id])
+        updated = await self.repository.update(db_material_stock)
+        await inventory_cache.invalidate([material_id])
+        publish_stock_changes(STOCK_UPDATED, [updated])
         if material_stock.material_description is not None:
-            db_material_stock.material_description = material_stock.material_description
-
-        if material_stock.quantity is not None:
-            db_material_stock.quantity = material_stock.quantity
-            db_material_stock.update_available()
+            search_index.invalidate()
+        return updated
 
-        if material_stock.reserved is not None:
-            try:
-                db_material_stock.reserved = material_stock.reserved
-                db_material_stock.update_available()
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=str(e)
-                )
+    async def delete_material_stock(self, material_id: str) -> None:
+        material_stock = await self.get_material_stock(material_id)
+        await self.repository.delete(material_stock)
+        await inventory_cache.invalidate([material_id])
+        publish_stock_deleted(material_id)
+        search_index.invalidate()
 
-        return self.repository.update(db_material_stock)
+    async def get_low_stock_materials(self, threshold: Optional[float] = None) -> List[MaterialStock]:
+        """threshold verilmezse malzeme başına yeniden sipariş noktaları (açık uyarılar) kullanılır"""
+        return await self.repository.get_low_stock_materials(threshold)
 
-    def delete_material_stock(self, material_id: str) -> None:
-        material_stock = self.get_material_stock(material_id)
-        self.repository.delete(material_stock)
+    async def list_alerts(
+        self,
+        alert_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[InventoryAlert]:
+        return [
+            InventoryAlert.model_validate(alert)
+            for alert in await self.repository.list_alerts(alert_type, skip, limit)
+        ]
 
-    def get_low_stock_materials(self, threshold: float = 10.0) -> List[MaterialStock]:
-        return self.repository.get_low_stock_materials(threshold)
+    async def apply_forecast_reorder_points(
+        self,
+        lead_time_days: int,
+        service_level_z: float = 1.65,
+        material_ids: Optional[List[str]] = None
+    ) -> ReorderPointForecastResponse:
+        """
+        Yeniden sipariş noktasını güncel tahminden türetir: tedarik süresi
+        boyunca beklenen miktar + z * tahmin belirsizliği (emniyet stoğu).
+        Tahmini olmayan malzemelere dokunulmaz.
+        """
+        start = datetime.utcnow()
+        forecasts = await self.repository.get_lead_time_forecasts(
+            start, start + timedelta(days=lead_time_days), material_ids)
+        rows = [
+            {"id": stock_id,
+             "reorder_point": max(expected, 0.0) + service_level_z * math.sqrt(max(variance or 0.0, 0.0))}
+            for stock_id, _, expected, variance in forecasts
+        ]
+        await self.repository.set_reorder_points(rows)
+        updated_ids = [material_id for _, material_id, _, _ in forecasts]
+        await self.repository.refresh_alerts(updated_ids)
+        await self.repository.db.commit()
+        await inventory_cache.invalidate(updated_ids)
+        publish_stock_changes(
+            STOCK_UPDATED, await self.repository.get_many(updated_ids) if updated_ids else [])
+        return ReorderPointForecastResponse(
+            updated=len(rows), lead_time_days=lead_time_days, service_level_z=service_level_z)
 
-    def adjust_stock(
+    async def adjust_stock(
         self,
         material_id: str,
         quantity_change: float,
         is_reserved: bool = False,
         notes: Optional[str] = None
     ) -> MaterialStock:
-        material_stock = self.get_material_stock(material_id)
-
-        try:
-            if is_reserved:
-                previous_quantity = material_stock.reserved
-                new_reserved = previous_quantity + quantity_change
-                if new_reserved < 0:
-                    raise ValueError("Reserved quantity cannot be negative")
-                material_stock.reserved = new_reserved
-            else:
-                previous_quantity = material_stock.quantity
-                new_quantity = previous_quantity + quantity_change
-                if new_quantity < material_stock.reserved:
-                    raise ValueError(
-                        "Total quantity cannot be less than reserved quantity")
-                material_stock.quantity = new_quantity
-
-            material_stock.update_available()
-            updated_stock = self.repository.update(material_stock)
-
-            self.repository.create_stock_history(
-                material_id=material_id,
-                quantity_change=quantity_change,
-                is_reserved=is_reserved,
-                previous_quantity=previous_quantity,
-                new_quantity=new_reserved if is_reserved else new_quantity,
-                notes=notes
-            )
-
-            return updated_stock
-
-        except ValueError as e:
+        """
+        Stok hareketini atomik artırımla uygular; hareket kaydı, gün sonu
+        durumu ve uyarılar aynı işlemde yazılır. Okuma-hesaplama-yazma
+        yapılmadığından eşzamanlı hareketlerde güncelleme kaybolmaz.
+        """
+        material_stock = await self.repository.increment_stock(
+            material_id, quantity_change, is_reserved)
+        if material_stock is None:
+            await self.repository.db.rollback()
+            current = await self.get_material_stock(material_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
+                detail=_adjustment_error(current, quantity_change, is_reserved)
             )
 
-    def get_stock_trend(self, material_id: str, days: int = 30) -> List[StockTrendResponse]:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        new_quantity = material_stock.reserved if is_reserved else material_stock.quantity
+        await self.repository.add_stock_history_bulk([{
+            "material_id": material_id,
+            "quantity_change": quantity_change,
+            "is_reserved": is_reserved,
+            # Önceki değer RETURNING ile dönen yeni değerden türetilir
+            "previous_quantity": new_quantity - quantity_change,
+            "new_quantity": new_quantity,
+            "notes": notes
+        }])
+        await self.repository.upsert_daily_snapshots([snapshot_row(material_stock)])
+        await self.repository.refresh_alerts([material_id])
+        await self.repository.db.commit()
+        await inventory_cache.invalidate([material_id])
+        publish_stock_changes(STOCK_ADJUSTED, [material_stock])
+        return material_stock
 
-        stock_movements = self.repository.get_stock_history(
-            material_id=material_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+    async def bulk_adjust_stock(
+        self,
+        adjustments: List[StockAdjustmentItem],
+        atomic: bool = False
+    ) -> StockAdjustmentBulkResponse:
+        """
+        Stok hareketlerini tek işlemde uygular: etkilenen kayıtlar tek kilitli
+        sorguyla okunur, hareket geçmişi toplu eklenir ve tek commit yapılır.
+        Hatalı kalemler raporlanır; atomic=True ise tek hata tüm işlemi geri alır.
+        """
+        material_ids = sorted({item.material_id for item in adjustments})
+        stocks = {
+            stock.material_id: stock
+            for stock in await self.repository.get_many_for_update(material_ids)
+        }
 
-        current_stock = self.get_material_stock(material_id)
-        daily_stocks = {}
+        results: List[StockAdjustmentItemResult] = []
+        history_rows = []
+        for index, item in enumerate(adjustments):
+            material_stock = stocks.get(item.material_id)
+            if material_stock is None:
+                results.append(StockAdjustmentItemResult(
+                    index=index,
+                    material_id=item.material_id,
+                    success=False,
+                    error=f"Material stock with id {item.material_id} not found"
+                ))
+                continue
 
-        current_date = start_date
-        while current_date <= end_date:
-            daily_stocks[current_date.date()] = StockTrendResponse(
-                date=current_date,
-                quantity=current_stock.quantity,
-                reserved=current_stock.reserved,
-                available=current_stock.available
-            )
-            current_date += timedelta(days=1)
-
-        for movement in stock_movements:
-            date = movement.created_at.date()
-            if date in daily_stocks:
-                stock = daily_stocks[date]
-                if movement.is_reserved:
-                    stock.reserved = movement.new_quantity
-                    stock.available = stock.quantity - movement.new_quantity
-                else:
-                    stock.quantity = movement.new_quantity
-                    stock.available = movement.new_quantity - stock.reserved
-
-        return list(daily_stocks.values())
-
-    def get_stock_history(self, material_id: str, limit: int = 100) -> List[StockHistoryResponse]:
-        return [
-            StockHistoryResponse.from_orm(record)
-            for record in self.repository.get_stock_history_paginated(
-                material_id=material_id,
-                limit=limit
+            snapshot = (material_stock.quantity,
+                        material_stock.reserved, material_stock.available)
+            try:
+                previous_quantity, new_quantity = _apply_adjustment(
+                    material_stock, item.quantity_change, item.is_reserved)
+            except ValueError as e:
+                material_stock.quantity, material_stock.reserved, material_stock.available = snapshot
+                results.append(StockAdjustmentItemResult(
+                    index=index,
+                    material_id=item.material_id,
+                    success=False,
+                    error=str(e)
+                ))
+                continue
+
+            history_rows.append({
+                "material_id": item.material_id,
+                "quantity_change": item.quantity_change,
+                "is_reserved": item.is_reserved,
+                "previous_quantity": previous_quantity,
+                "new_quantity": new_quantity,
+                "notes": item.notes
+            })
+            results.append(StockAdjustmentItemResult(
+                index=index,
+                material_id=item.material_id,
+                success=True,
+                previous_quantity=previous_quantity,
+                new_quantity=new_quantity
+            ))
+
+        failed = sum(1 for result in results if not result.success)
+        if not history_rows or (atomic and failed):
+            await self.repository.db.rollback()
+            return StockAdjustmentBulkResponse(
+                applied=0, failed=failed, committed=False, results=results)
+
+        await self.repository.add_stock_history_bulk(history_rows)
+        adjusted_ids = sorted({row["material_id"] for row in history_rows})
+        snapshot_date = today()
+        await self.repository.upsert_daily_snapshots([
+            snapshot_row(stocks[material_id], snapshot_date) for material_id in adjusted_ids
+        ])
+        await self.repository.refresh_alerts(adjusted_ids)
+        await self.repository.db.commit()
+        await inventory_cache.invalidate(adjusted_ids)
+        publish_stock_changes(STOCK_ADJUSTED, [stocks[material_id] for material_id in adjusted_ids])
+        return StockAdjustmentBulkResponse(
+            applied=len(history_rows), failed=failed, committed=True, results=results)
+
+    async def get_stock_history(
+        self,
+        material_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        movement_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[StockHistoryResponse], Optional[str]]:
+        """Hareket geçmişi sayfası (yeniden eskiye) ve sonraki sayfa imleci"""
+        await self.get_material_stock(material_id)
+        before = decode_history_cursor(cursor) if cursor else None
+        records = await self.repository.get_stock_history_paginated(
+            material_id, limit + 1, before, movement_type, start_date, end_date)
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_history_cursor(records[-1])
+        return [StockHistoryResponse.model_validate(r) for r in records], next_cursor
+
+    async def get_stock_trend(self, material_id: str, days: int = 30) -> List[StockTrendResponse]:
+        """
+        Gün sonu tablosundan günlük stok seyri; bugün dahil son days+1 gün.
+        Aralıktan önce gün sonu satırı yoksa ilk satıra kadarki günler
+        aralıktaki ilk hareketlerin önceki değerlerinden doldurulur.
+        """
+        current_stock = await self.get_material_stock(material_id)
+        end_date = today()
+        start_date = end_date - timedelta(days=days)
+        snapshots = await self.repository.get_daily_snapshots(material_id, start_date, end_date)
+
+        if snapshots and snapshots[0].snapshot_date <= start_date:
+            leading = None
+        else:
+            first = snapshots[0] if snapshots else current_stock
+            fallback = (first.quantity, first.reserved or 0, first.available)
+            leading = state_before(
+                await self.repository.get_first_movements(
+                    material_id, datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)),
+                fallback
             )
-        ]
+        return build_trend(snapshots, start_date, end_date, leading)
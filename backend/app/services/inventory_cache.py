@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+KEY_PREFIX = "inventory"
+LIST_GENERATION_KEY = f"{KEY_PREFIX}:list:generation"
+
+
+class InventoryReadCache:
+    """
+    Stok okuma uçları (tek kayıt ve liste) için yanıt önbelleği.
+
+    Tek kayıtların anahtarı material_id ile o kaydın sürüm sayacını taşır;
+    yazmada yalnızca o kaydın sayacı artırılır. Liste sayfaları her yazmada artan bir nesil numarasını
+    anahtarlarında taşır; nesil artınca eski sayfaların hepsi tek işlemle
+    geçersizleşir ve TTL ile temizlenir. Veritabanından yükleme sırasında
+    geçersiz kılma olursa okuyucunun yazdığı değer eski sürümün anahtarına
+    düşer ve bir daha okunmaz. Arka uç hataları okumayı
+    engellemez, veritabanına düşülür.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def stock_version_key(material_id: str) -> str:
+        return f"{KEY_PREFIX}:stock:{material_id}:version"
+
+    async def _stock_key(self, material_id: str) -> str:
+        version = await self.backend.get(self.stock_version_key(material_id)) or b"0"
+        return f"{KEY_PREFIX}:stock:{material_id}:{int(version)}"
+
+    async def _list_key(self, params: Dict[str, Any]) -> str:
+        generation = await self.backend.get(LIST_GENERATION_KEY) or b"0"
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{KEY_PREFIX}:list:{int(generation)}:{digest}"
+
+    async def _get_or_load(self, key_factory: Callable[[], Awaitable[str]], model: Type[T],
+                           loader: Callable[[], Awaitable[T]]) -> T:
+        key = None
+        try:
+            key = await key_factory()
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Inventory cache read failed: {e}")
+            self._count("errors")
+            cached = None
+
+        if cached is not None:
+            self._count("hits")
+            return model.model_validate_json(cached)
+
+        self._count("misses")
+        value = await loader()
+        if key is not None:
+            try:
+                await self.backend.set(key, value.model_dump_json().encode(), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Inventory cache write failed: {e}")
+                self._count("errors")
+        return value
+
+    async def get_stock(self, material_id: str, model: Type[T],
+                        loader: Callable[[], Awaitable[T]]) -> T:
+        return await self._get_or_load(lambda: self._stock_key(material_id), model, loader)
+
+    async def get_list(self, params: Dict[str, Any], model: Type[T],
+                       loader: Callable[[], Awaitable[T]]) -> T:
+        return await self._get_or_load(lambda: self._list_key(params), model, loader)
+
+    async def invalidate(self, material_ids: Iterable[str] = ()) -> None:
+        """Verilen kayıtları ve tüm liste sayfalarını geçersiz kılar"""
+        try:
+            for material_id in material_ids:
+                await self.backend.incr(self.stock_version_key(material_id))
+            await self.backend.incr(LIST_GENERATION_KEY)
+            self._count("invalidations")
+        except Exception as e:
+            logger.error(f"Inventory cache invalidation failed: {e}")
+            self._count("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+inventory_cache = InventoryReadCache(
+    create_cache_backend(settings.INVENTORY_CACHE_URL, settings.INVENTORY_CACHE_MAX_ITEMS),
+    settings.INVENTORY_CACHE_TTL
+)
@@ -0,0 +1,72 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.events import EventBus, EVENT_RESYNC
+
+logger = logging.getLogger(__name__)
+
+STOCK_CREATED = "stock.created"
+STOCK_UPDATED = "stock.updated"
+STOCK_ADJUSTED = "stock.adjusted"
+STOCK_DELETED = "stock.deleted"
+
+inventory_events = EventBus(settings.INVENTORY_EVENTS_QUEUE_SIZE)
+
+
+def _stock_payload(stock: Any) -> Dict[str, Any]:
+    """ORM nesnesi ya da upsert satırı (dict) için olay gövdesi"""
+    get = stock.get if isinstance(stock, dict) else lambda name: getattr(stock, name, None)
+    return {
+        "quantity": get("quantity"),
+        "reserved": get("reserved"),
+        "available": get("available"),
+        "reorder_point": get("reorder_point")
+    }
+
+
+def publish_stock_changes(event_type: str, stocks: Iterable[Any]) -> None:
+    """Commit sonrası çağrılır; aboneler güncel stok durumunu alır"""
+    for stock in stocks:
+        material_id = stock["material_id"] if isinstance(stock, dict) else stock.material_id
+        inventory_events.publish(event_type, material_id, **_stock_payload(stock))
+
+
+def publish_stock_deleted(material_id: str) -> None:
+    inventory_events.publish(STOCK_DELETED, material_id)
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    data = {k: v for k, v in event.items() if k not in ("id", "key")}
+    if event.get("key") is not None:
+        data["material_id"] = event["key"]
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_inventory_events(
+    request: Request,
+    material_ids: Optional[Iterable[str]] = None,
+    heartbeat_seconds: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events akışı. material_ids verilirse yalnızca o malzemelerin
+    olayları gönderilir. Boşta kalan bağlantıya heartbeat yorumu yazılır;
+    kuyruğu taşan istemci resync olayı alır ve durumu yeniden okumalıdır.
+    """
+    heartbeat = heartbeat_seconds or settings.INVENTORY_EVENTS_HEARTBEAT_SECONDS
+    subscription = inventory_events.subscribe(frozenset(material_ids) if material_ids else None)
+    try:
+        yield f"retry: {heartbeat * 1000}\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            if event["type"] == EVENT_RESYNC:
+                logger.warning(f"Inventory event subscriber lagged, {subscription.dropped} events dropped")
+            yield _format_sse(event)
+    finally:
+        subscription.close()
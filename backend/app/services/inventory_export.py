@@ -0,0 +1,185 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
+
+import orjson
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.repositories.inventory import (
+    AsyncInventoryRepository,
+    STOCK_ROW_FIELDS,
+    HISTORY_ROW_FIELDS
+)
+from app.services.stock_history_partitions import stock_history_parquet_schema
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+RowBatches = AsyncIterator[Sequence[Sequence[Any]]]
+
+
+def stock_parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()),
+        ("material_id", pa.string()),
+        ("material_description", pa.string()),
+        ("quantity", pa.float64()),
+        ("reserved", pa.float64()),
+        ("reorder_point", pa.float64()),
+        ("available", pa.float64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    ParquetWriter için yalnızca ekleme yapılan çıktı. Yazılanlar drain ile
+    alınıp bırakılır; tell toplam konumu verdiğinden dosya sonundaki
+    metadata'daki ofsetler doğru kalır.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _write_csv(fields: Sequence[str], batches: RowBatches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for rows in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Satır olmasa da başlık gönderilir
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _write_ndjson(fields: Sequence[str], batches: RowBatches) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+async def _write_parquet(schema, batches: RowBatches) -> AsyncIterator[bytes]:
+    """Her grup ayrı bir row group olarak yazılır ve hemen gönderilir"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _encode(export_format: str, fields: Sequence[str], schema_factory: Callable[[], Any],
+            batches: RowBatches) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        return _write_csv(fields, batches)
+    if export_format == "ndjson":
+        return _write_ndjson(fields, batches)
+    if export_format == "parquet":
+        return _write_parquet(schema_factory(), batches)
+    raise ValueError(f"Unsupported export format {export_format}")
+
+
+async def _export(export_format: str, fields: Sequence[str], schema_factory: Callable[[], Any],
+                  query: Callable[[AsyncInventoryRepository, int], RowBatches],
+                  name: str) -> AsyncIterator[bytes]:
+    """
+    Yanıt gövdesi istek bağımlılıkları kapandıktan sonra üretildiğinden
+    kendi oturumunu açar. Bellek kullanımı tablo boyutundan bağımsız olarak
+    bir grup (INVENTORY_EXPORT_BATCH_SIZE satır) ile sınırlıdır.
+    """
+    batch_size = settings.INVENTORY_EXPORT_BATCH_SIZE
+    async with AsyncSessionLocal() as db:
+        repository = AsyncInventoryRepository(db)
+        rows_written = 0
+
+        async def batches() -> RowBatches:
+            nonlocal rows_written
+            async for rows in query(repository, batch_size):
+                rows_written += len(rows)
+                yield rows
+
+        try:
+            async for chunk in _encode(export_format, fields, schema_factory, batches()):
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Export of {name} failed after {rows_written} rows: {e}")
+            raise
+        logger.info(f"Exported {rows_written} {name} rows as {export_format}")
+
+
+def export_stocks(export_format: str) -> AsyncIterator[bytes]:
+    """material_stocks tablosunun tamamı, material_id sırasıyla"""
+    return _export(
+        export_format, STOCK_ROW_FIELDS, stock_parquet_schema,
+        lambda repository, batch_size: repository.stream_stock_rows(batch_size),
+        "material_stocks"
+    )
+
+
+def export_stock_history(
+    export_format: str,
+    start_date: datetime,
+    end_date: datetime,
+    material_id: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """[start_date, end_date) aralığındaki stok hareketleri, created_at sırasıyla"""
+    return _export(
+        export_format, HISTORY_ROW_FIELDS, stock_history_parquet_schema,
+        lambda repository, batch_size: repository.stream_stock_history_rows(
+            start_date, end_date, material_id, batch_size),
+        "stock_history"
+    )
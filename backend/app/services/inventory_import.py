@@ -0,0 +1,200 @@
+import codecs
+import csv
+import json
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.inventory import MaterialStockCreate, BulkImportError, BulkImportResponse
+from app.repositories.inventory import AsyncInventoryRepository
+from app.services.inventory_search import search_index
+from app.services.inventory_cache import inventory_cache
+from app.services.inventory_events import publish_stock_changes, STOCK_CREATED, STOCK_UPDATED
+from app.services.stock_snapshots import today
+
+logger = logging.getLogger(__name__)
+
+CONTENT_JSON = "application/json"
+CONTENT_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CONTENT_CSV = ("text/csv", "application/csv")
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class _LineFeed:
+    """
+    Tek csv.reader'a satır besleyen yineleyici. Satırlar kayıt tamamlandıkça
+    eklenir; okuyucu yalnızca eksiksiz bir kayıt beklerken çağrılır.
+    """
+
+    def __init__(self):
+        self._lines: Deque[str] = deque()
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    """İstek gövdesini tamamını belleğe almadan satır satır okur"""
+    # Parça sınırında bölünen çok baytlı karakterler için artımlı çözücü
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_upload_records(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Gövdeyi içerik tipine göre (JSON dizi, NDJSON, CSV) kayıtlara ayırır;
+    (satır/sıra no, kayıt) çiftleri üretir. NDJSON ve CSV akış olarak okunur.
+    """
+    content_type = request.headers.get("content-type", CONTENT_JSON).split(";")[0].strip().lower()
+
+    if content_type in CONTENT_NDJSON:
+        line_no = 0
+        async for line in _iter_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+    elif content_type in CONTENT_CSV:
+        header: Optional[List[str]] = None
+        feed = _LineFeed()
+        reader = csv.reader(feed)
+        line_no = 0
+        record_line: Optional[int] = None
+        quotes = 0
+        async for line in _iter_lines(request):
+            line_no += 1
+            if record_line is None:
+                if not line.strip():
+                    continue
+                record_line = line_no
+            feed.append(line + "\n")
+            # Tek sayıda tırnak: tırnaklı alan içinde satır sonu, kayıt sürüyor
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            values = next(reader)
+            start, record_line, quotes = record_line, None, 0
+            if header is None:
+                header = [value.strip().lower() for value in values]
+                continue
+            # Boş hücreler alan hiç verilmemiş gibi davranır (ör. reserved varsayılanı)
+            yield start, {k: v for k, v in zip(header, values) if v != ""}
+        if record_line is not None:
+            yield record_line, ValueError("Unterminated quoted field")
+    elif content_type == CONTENT_JSON:
+        payload = await request.json()
+        if not isinstance(payload, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="JSON body must be an array of material stocks"
+            )
+        for index, record in enumerate(payload):
+            yield index, record
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type {content_type}; use JSON, NDJSON or CSV"
+        )
+
+
+def _to_row(record: Any) -> Dict[str, Any]:
+    if isinstance(record, Exception):
+        raise ValueError(str(record))
+    stock = MaterialStockCreate.model_validate(record)
+    if stock.reserved > stock.quantity:
+        raise ValueError("Reserved quantity cannot be greater than total quantity")
+    return {
+        "material_id": stock.material_id,
+        "material_description": stock.material_description,
+        "quantity": stock.quantity,
+        "reserved": stock.reserved,
+        # None ise mevcut satırdaki değer korunur
+        "reorder_point": stock.reorder_point,
+        # Yeni satırlar için; mevcut satırlarda ON CONFLICT içinde SQL ile hesaplanır
+        "available": stock.quantity - stock.reserved
+    }
+
+
+class InventoryBulkImporter:
+    """
+    Kayıtları doğrular ve INVENTORY_BULK_BATCH_SIZE'lık gruplar halinde
+    INSERT ... ON CONFLICT ile yazar; her grup ayrı commit edilir.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
+        self.repository = AsyncInventoryRepository(db)
+        self.batch_size = batch_size or settings.INVENTORY_BULK_BATCH_SIZE
+
+    async def _flush(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        if not batch:
+            return 0
+        written = await self.repository.upsert_stocks(list(batch.values()))
+        snapshot_date = today()
+        await self.repository.upsert_daily_snapshots([
+            {"material_id": row["material_id"], "snapshot_date": snapshot_date,
+             "quantity": row["quantity"], "reserved": row["reserved"], "available": row["available"]}
+            for row in written
+        ])
+        await self.repository.refresh_alerts(list(batch))
+        await self.repository.db.commit()
+        await inventory_cache.invalidate(list(batch))
+        publish_stock_changes(STOCK_CREATED, [row for row in written if row["created"]])
+        publish_stock_changes(STOCK_UPDATED, [row for row in written if not row["created"]])
+        search_index.invalidate()
+        return len(batch)
+
+    async def import_records(self, records: AsyncIterator[Tuple[int, Any]]) -> BulkImportResponse:
+        received = upserted = failed = 0
+        errors: List[BulkImportError] = []
+        # Aynı grupta tekrar eden malzemede son kayıt geçerlidir
+        batch: Dict[str, Dict[str, Any]] = {}
+
+        async for position, record in records:
+            received += 1
+            try:
+                row = _to_row(record)
+            except (ValidationError, ValueError, TypeError) as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(BulkImportError(position=position, error=str(e)))
+                continue
+
+            batch[row["material_id"]] = row
+            if len(batch) >= self.batch_size:
+                upserted += await self._flush(batch)
+                batch = {}
+
+        upserted += await self._flush(batch)
+        logger.info(
+            f"Bulk import: received={received}, upserted={upserted}, failed={failed}")
+        return BulkImportResponse(
+            received=received,
+            upserted=upserted,
+            failed=failed,
+            errors=errors
+        )
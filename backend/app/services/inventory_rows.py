@@ -0,0 +1,97 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import AsyncSessionLocal
+from app.repositories.inventory import AsyncInventoryRepository, STOCK_ROW_FIELDS
+from app.services.inventory import encode_cursor, decode_cursor
+from app.services.inventory_search import search_index
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+
+
+def rows_to_records(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Sütun demetlerini MaterialStockRead biçimindeki sözlüklere çevirir (doğrulamasız)"""
+    return [dict(zip(STOCK_ROW_FIELDS, row)) for row in rows]
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload)
+
+
+def dumps_ndjson(rows: Sequence[Sequence[Any]]) -> bytes:
+    return b"".join(
+        orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        for record in rows_to_records(rows)
+    )
+
+
+class InventoryRowService:
+    """
+    Stok listeleri için hafif okuma yolu: yalnızca gerekli sütunlar
+    demet olarak okunur, ORM nesnesi ve pydantic doğrulaması atlanır ve
+    orjson ile serileştirilir. Alanlar MaterialStockRead ile aynıdır.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncInventoryRepository(db)
+
+    async def list_stock_rows(
+        self,
+        limit: int = 100,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        material_id sırasıyla keyset sayfası ve sonraki sayfa imleci. Arama
+        sonuçları GET /inventory ile aynı alaka sırasında, ofset imleciyle döner.
+        """
+        if search:
+            return await self._search_stock_rows(search, limit, cursor)
+
+        after = decode_cursor(cursor, "m") if cursor else None
+        rows = await self.repository.list_stock_rows(limit + 1, None, after)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(m=rows[-1].material_id)
+        return rows, next_cursor
+
+    async def _search_stock_rows(
+        self,
+        search: str,
+        limit: int,
+        cursor: Optional[str]
+    ) -> Tuple[List[Any], Optional[str]]:
+        offset = decode_cursor(cursor, "o") if cursor else 0
+        if self.repository.dialect == "postgresql":
+            rows = await self.repository.search_stock_rows(search, offset, limit + 1)
+        else:
+            await search_index.ensure(self.repository)
+            matches = search_index.search(search)
+            rows = await self.repository.get_many_rows(matches[offset:offset + limit + 1])
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(o=offset + limit)
+        return rows, next_cursor
+
+    async def low_stock_rows(self, threshold: Optional[float] = None) -> List[Any]:
+        rows: List[Any] = []
+        async for batch in self.repository.stream_low_stock_rows(threshold, STREAM_BATCH_SIZE):
+            rows.extend(batch)
+        return rows
+
+
+async def iter_low_stock_ndjson(threshold: Optional[float] = None) -> AsyncIterator[bytes]:
+    """
+    Düşük stoklu malzemeleri NDJSON olarak akıtır. Yanıt gövdesi istek
+    bağımlılıkları kapandıktan sonra üretildiğinden kendi oturumunu açar.
+    """
+    async with AsyncSessionLocal() as db:
+        repository = AsyncInventoryRepository(db)
+        async for batch in repository.stream_low_stock_rows(threshold, STREAM_BATCH_SIZE):
+            yield dumps_ndjson(batch)
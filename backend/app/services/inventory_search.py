@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.repositories.inventory import SEARCH_TRIGRAM_MIN_LENGTH
+
+logger = logging.getLogger(__name__)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class MaterialSearchIndex:
+    """
+    pg_trgm bulunmayan (SQLite) kurulumlar için bellek içi malzeme arama
+    indeksi. PostgreSQL'deki sıralamaya yakın bir kural izler: tam eşleşme,
+    material_id öneki, ardından eşleşen alanın uzunluğuna göre benzerlik.
+
+    İndeks ilk aramada veritabanından kurulur; yazma işlemlerinde
+    invalidate() ile, diğer süreçlerdeki değişiklikler için de
+    INVENTORY_SEARCH_INDEX_TTL sonunda yenilenir.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._documents: Dict[str, Tuple[str, str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._built_at = None
+
+    def _is_fresh(self) -> bool:
+        return (self._built_at is not None
+                and time.monotonic() - self._built_at < self.ttl_seconds)
+
+    def build(self, documents: Iterable[Tuple[str, Optional[str]]]) -> None:
+        self._documents = {
+            material_id: (material_id.lower(), (description or "").lower())
+            for material_id, description in documents
+        }
+        postings: Dict[str, Set[str]] = {}
+        for material_id, fields in self._documents.items():
+            for field in fields:
+                for trigram in _trigrams(field):
+                    postings.setdefault(trigram, set()).add(material_id)
+        self._postings = postings
+        self._built_at = time.monotonic()
+        logger.info(f"Built material search index with {len(self._documents)} materials")
+
+    async def ensure(self, repository) -> None:
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if not self._is_fresh():
+                self.build(await repository.list_search_documents())
+
+    def search(self, term: str) -> List[str]:
+        """Terime uyan material_id'leri sıralı döner"""
+        term = term.lower()
+        if len(term) < SEARCH_TRIGRAM_MIN_LENGTH:
+            # Trigramı olmayan kısa terimlerde tüm belgeler taranır
+            candidates = self._documents.keys()
+        else:
+            # Terimin tüm trigramlarını içermeyen belge alt dize eşleşmesi olamaz
+            postings = sorted(
+                (self._postings.get(t, set()) for t in _trigrams(term)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+
+        ranked = []
+        for material_id in candidates:
+            id_lower, description = self._documents[material_id]
+            fields = [f for f in (id_lower, description) if term in f]
+            if not fields:
+                continue
+            rank = 3 if id_lower == term else 2 if id_lower.startswith(term) else 0
+            similarity = max(len(term) / len(f) for f in fields)
+            ranked.append((-(rank + similarity), material_id))
+        ranked.sort()
+        return [material_id for _, material_id in ranked]
+
+
+search_index = MaterialSearchIndex(settings.INVENTORY_SEARCH_INDEX_TTL)
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import joblib
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.forecast import ForecastModel
+from app.repositories.forecast import ForecastModelRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """
+    Yüklenmiş modeller için boyut sınırlı, thread-safe LRU önbellek.
+    Anahtar (material_id, version) olduğundan yeni sürüm kendiliğinden ıska verir.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                evicted, _ = self._items.popitem(last=False)
+                self.evictions += 1
+                logger.debug(f"Evicted model {evicted} from cache")
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Önbellekte yoksa loader ile yükler; (değer, önbellekten_mi) döner"""
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        # Yükleme kilit dışında yapılır; aynı anahtarı iki istek birlikte
+        # yüklerse sonuncusu kazanır, bu da zararsızdır.
+        value = loader()
+        self.put(key, value)
+        return value, False
+
+    def discard(self, material_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._items if k[0] == material_id]:
+                del self._items[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+model_cache = ModelCache(settings.FORECAST_MODEL_CACHE_SIZE)
+
+
+class ModelRegistry:
+    def __init__(self, db: Session, cache: ModelCache = model_cache):
+        self.repository = ForecastModelRepository(db)
+        self.cache = cache
+
+    def register(
+        self,
+        material_id: str,
+        version: str,
+        model_path: Optional[str],
+        metrics: Optional[Dict[str, Any]] = None,
+        validation_metrics: Optional[Dict[str, Any]] = None,
+        training_size: Optional[int] = None,
+        model_type: str = "prophet",
+        data_hash: Optional[str] = None
+    ) -> ForecastModel:
+        """Eğitilen modeli malzemenin en güncel sürümü olarak kaydeder"""
+        try:
+            entry = self.repository.create_latest(ForecastModel(
+                material_id=material_id,
+                version=version,
+                model_type=model_type,
+                model_path=model_path,
+                metrics=metrics,
+                validation_metrics=validation_metrics,
+                training_size=training_size,
+                data_hash=data_hash
+            ))
+        except Exception:
+            self.repository.db.rollback()
+            raise
+        logger.info(f"Registered model {material_id}@{version}")
+        return entry
+
+    def register_training_row(self, row: Dict[str, Any]) -> ForecastModel:
+        """Toplu eğitim sonuç satırını (cv_*/val_* sütunları) kaydeder"""
+        return self.register(
+            material_id=row["material_id"],
+            version=row["version"],
+            model_path=row["model_path"],
+            metrics={k[3:]: v for k, v in row.items() if k.startswith("cv_")},
+            validation_metrics={
+                k[4:]: v for k, v in row.items() if k.startswith("val_")} or None,
+            training_size=row.get("training_size"),
+            data_hash=row.get("data_hash")
+        )
+
+    def training_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Artımlı eğitim için malzeme başına son veri özeti/eğitim zamanı"""
+        return self.repository.get_manifest()
+
+    def get_latest(self, material_id: str) -> ForecastModel:
+        entry = self.repository.get_latest(material_id)
+        if not entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No trained model found for material {material_id}"
+            )
+        return entry
+
+    def list_latest(self, skip: int = 0, limit: int = 100) -> List[ForecastModel]:
+        return self.repository.list_latest(skip, limit)
+
+    def list_versions(self, material_id: str, limit: int = 20) -> List[ForecastModel]:
+        return self.repository.list_versions(material_id, limit)
+
+    def load_model(self, entry: ForecastModel) -> Tuple[Any, bool]:
+        """Model nesnesini önbellekten ya da diskten getirir"""
+        if not entry.model_path:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Model {entry.material_id}@{entry.version} ({entry.model_type}) has no "
+                       f"serialized artifact; use GET /forecast/stored/{entry.material_id}"
+            )
+
+        def loader():
+            started = time.perf_counter()
+            model = joblib.load(entry.model_path)
+            logger.info(
+                f"Loaded model {entry.material_id}@{entry.version} in {time.perf_counter() - started:.2f}s")
+            return model
+
+        try:
+            return self.cache.get_or_load((entry.material_id, entry.version), loader)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"Model file for {entry.material_id}@{entry.version} is missing"
+            )
+
+    def predict(self, material_id: str, periods: int = 12, freq: str = "W") -> Dict[str, Any]:
+        """En güncel modelle geleceğe yönelik tahmin üretir"""
+        entry = self.get_latest(material_id)
+        model, cached = self.load_model(entry)
+
+        future = model.make_future_dataframe(
+            periods=periods, freq=freq, include_history=False)
+        forecast = model.predict(future)
+
+        return {
+            "material_id": material_id,
+            "version": entry.version,
+            "cached": cached,
+            "forecast": forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].to_dict(orient="records")
+        }
+
+    def warm_up(self, limit: Optional[int] = None) -> int:
+        """En son eğitilen malzemelerin modellerini önbelleğe yükler"""
+        limit = min(limit or settings.FORECAST_MODEL_WARMUP,
+                    self.cache.max_size)
+        loaded = 0
+        for entry in self.repository.list_latest(0, limit):
+            if not entry.model_path:
+                continue
+            try:
+                self.load_model(entry)
+                loaded += 1
+            except HTTPException as e:
+                logger.warning(f"Skipping warm-up of {entry.material_id}: {e.detail}")
+        logger.info(f"Warmed up {loaded} forecast models")
+        return loaded
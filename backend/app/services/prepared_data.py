@@ -0,0 +1,114 @@
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATTERN = "prepared_manifest_*.feather"
+OFFSET_COLUMNS = ("start", "stop")
+
+
+class PreparedMaterial(Mapping):
+    """
+    Tek malzemenin {"stats", "data"} görünümü; seri yalnızca "data"
+    istendiğinde okunur.
+    """
+
+    def __init__(self, store: "PreparedDataStore", material_id: str):
+        self._store = store
+        self._material_id = material_id
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "stats":
+            return self._store.get_stats(self._material_id)
+        if key == "data":
+            return self._store.load_series(self._material_id)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("data", "stats"))
+
+    def __len__(self) -> int:
+        return 2
+
+
+class PreparedDataStore(Mapping):
+    """
+    data_cleaning.py'nin yazdığı indeksli sütunsal hazırlanmış veri deposu.
+
+    - prepared_manifest_<ts>.feather: malzeme başına istatistikler ve
+      seri dosyasındaki [start, stop) satır aralığı
+    - prepared_series_<ts>.arrow: malzemeye göre sıralı (MATERIAL, ds, y)
+      sıkıştırmasız Arrow IPC dosyası
+
+    Seri dosyası bellek eşlemli açılır; bir malzemeyi yüklemek yalnızca o
+    malzemenin satırlarını okur, istatistik taraması serileri hiç açmaz.
+    Eski pickle sözlüğüyle aynı Mapping arayüzünü sunar.
+    """
+
+    def __init__(self, manifest_path: Path, series_path: Path):
+        self.manifest_path = manifest_path
+        self.series_path = series_path
+        self.name = manifest_path.name
+        self.manifest = pd.read_feather(manifest_path)
+        self._positions = {
+            material_id: i for i, material_id in enumerate(self.manifest["MATERIAL"])
+        }
+        self._stat_columns = [
+            c for c in self.manifest.columns if c not in OFFSET_COLUMNS]
+        self._table = None
+
+    @classmethod
+    def from_manifest(cls, manifest_path: Path) -> "PreparedDataStore":
+        timestamp = manifest_path.stem[len("prepared_manifest_"):]
+        series_path = manifest_path.with_name(f"prepared_series_{timestamp}.arrow")
+        if not series_path.exists():
+            raise FileNotFoundError(f"Series file {series_path.name} is missing")
+        return cls(manifest_path, series_path)
+
+    def _series_table(self):
+        if self._table is None:
+            import pyarrow as pa
+            source = pa.memory_map(str(self.series_path), "r")
+            self._table = pa.ipc.open_file(source).read_all()
+        return self._table
+
+    def get_stats(self, material_id: str) -> Dict[str, Any]:
+        row = self.manifest.iloc[self._positions[material_id]]
+        # numpy skalerleri JSON'a yazılabilsin diye Python tiplerine çevrilir
+        return {
+            column: row[column].item() if hasattr(row[column], "item") else row[column]
+            for column in self._stat_columns
+        }
+
+    def stats_frame(self) -> pd.DataFrame:
+        """Tüm malzemelerin istatistikleri (seriler okunmaz)"""
+        return self.manifest[self._stat_columns]
+
+    def load_series(self, material_id: str) -> pd.DataFrame:
+        row = self.manifest.iloc[self._positions[material_id]]
+        start, stop = int(row["start"]), int(row["stop"])
+        return self._series_table().slice(start, stop - start).select(
+            ["ds", "y"]).to_pandas()
+
+    def __getitem__(self, material_id: str) -> PreparedMaterial:
+        if material_id not in self._positions:
+            raise KeyError(material_id)
+        return PreparedMaterial(self, material_id)
+
+    def __contains__(self, material_id: object) -> bool:
+        return material_id in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.manifest["MATERIAL"])
+
+    def __len__(self) -> int:
+        return len(self.manifest)
+
+
+def find_latest_manifest(directory: Path) -> Optional[Path]:
+    manifests = list(directory.glob(MANIFEST_PATTERN))
+    return max(manifests, key=lambda x: x.stat().st_mtime) if manifests else None
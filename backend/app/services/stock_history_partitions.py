@@ -0,0 +1,134 @@
+import logging
+import re
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.stock_snapshots import today
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+ARCHIVE_DIR = BASE_DIR / "output" / "archive" / "stock_history"
+ARCHIVE_BATCH_ROWS = 50_000
+PARTITION_PATTERN = re.compile(r"^stock_history_(\d{4})_(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def stock_history_parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()),
+        ("material_id", pa.string()),
+        ("quantity_change", pa.float64()),
+        ("is_reserved", pa.bool_()),
+        ("previous_quantity", pa.float64()),
+        ("new_quantity", pa.float64()),
+        ("notes", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+class StockHistoryPartitionManager:
+    """
+    stock_history'nin aylık bölümlerinin bakımı (yalnızca PostgreSQL).
+
+    - ensure_partitions: bu ay ve INVENTORY_HISTORY_PARTITIONS_AHEAD ay
+      ilerisi için bölüm oluşturur; eklemeler varsayılan bölüme düşmez
+    - archive_partitions: saklama süresini aşan ayları sıkıştırılmış Parquet
+      dosyasına yazar, ardından bölümü ayırıp siler
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def enabled(self) -> bool:
+        return self.db.bind.dialect.name == "postgresql"
+
+    async def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        if not self.enabled:
+            return []
+        if months_ahead is None:
+            months_ahead = settings.INVENTORY_HISTORY_PARTITIONS_AHEAD
+        current = today().replace(day=1)
+        names = []
+        for offset in range(months_ahead + 1):
+            names.append(await self.db.scalar(
+                text("SELECT ensure_stock_history_partition(:month)"),
+                {"month": _add_months(current, offset)}
+            ))
+        await self.db.commit()
+        return names
+
+    async def list_partitions(self) -> List[date]:
+        """Aylık bölümlerin ay başlangıçları (varsayılan bölüm hariç), eskiden yeniye"""
+        result = await self.db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'stock_history'::regclass"
+        ))
+        months = []
+        for name in result.scalars():
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    async def archive_partitions(
+        self,
+        retention_months: Optional[int] = None,
+        archive_dir: Path = ARCHIVE_DIR
+    ) -> List[Path]:
+        if not self.enabled:
+            return []
+        if retention_months is None:
+            retention_months = settings.INVENTORY_HISTORY_RETENTION_MONTHS
+        cutoff = _add_months(today().replace(day=1), -retention_months)
+
+        archived = []
+        for month in await self.list_partitions():
+            if month >= cutoff:
+                break
+            archived.append(await self._archive_partition(month, archive_dir))
+        return archived
+
+    async def _archive_partition(self, month: date, archive_dir: Path) -> Path:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        name = f"stock_history_{month:%Y_%m}"
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = archive_dir / f"{name}.parquet"
+        partial = path.with_suffix(".parquet.partial")
+
+        schema = stock_history_parquet_schema()
+        rows_written = 0
+        result = await self.db.stream(text(
+            f'SELECT {", ".join(schema.names)} FROM "{name}" '
+            f'ORDER BY material_id, created_at, id'
+        ))
+        with pq.ParquetWriter(partial, schema, compression="zstd") as writer:
+            async for rows in result.partitions(ARCHIVE_BATCH_ROWS):
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                rows_written += len(rows)
+        # Bölüm yalnızca dosya eksiksiz yazıldıktan sonra silinir
+        partial.replace(path)
+
+        await self.db.execute(text(f'ALTER TABLE stock_history DETACH PARTITION "{name}"'))
+        await self.db.execute(text(f'DROP TABLE "{name}"'))
+        await self.db.commit()
+        logger.info(f"Archived {rows_written} stock history rows from {name} to {path}")
+        return path
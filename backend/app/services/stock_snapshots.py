@@ -0,0 +1,151 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.inventory import MaterialStock, StockDailySnapshot, StockHistory, StockTrendResponse
+from app.repositories.inventory import AsyncInventoryRepository
+
+logger = logging.getLogger(__name__)
+
+
+def today() -> date:
+    return datetime.utcnow().date()
+
+
+def _utc_date(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def snapshot_row(material_stock: MaterialStock, snapshot_date: Optional[date] = None) -> Dict[str, Any]:
+    """Stok kaydının o günkü gün sonu satırı (son yazan kazanır)"""
+    return {
+        "material_id": material_stock.material_id,
+        "snapshot_date": snapshot_date or today(),
+        "quantity": material_stock.quantity,
+        "reserved": material_stock.reserved or 0,
+        "available": material_stock.available
+    }
+
+
+def state_before(
+    first_movements: List[StockHistory],
+    fallback: Tuple[float, float, float]
+) -> Tuple[float, float, float]:
+    """
+    Verilen ilk hareketlerden (miktar ve rezerv türünün birer ilk kaydı)
+    hareketler öncesindeki (quantity, reserved, available) durumunu çıkarır.
+    Hareketi olmayan değer için fallback kullanılır.
+    """
+    quantity, reserved, _ = fallback
+    for movement in first_movements:
+        if movement.is_reserved:
+            reserved = movement.previous_quantity
+        else:
+            quantity = movement.previous_quantity
+    return quantity, reserved, quantity - reserved
+
+
+def build_trend(
+    snapshots: List[StockDailySnapshot],
+    start_date: date,
+    end_date: date,
+    leading_state: Optional[Tuple[float, float, float]]
+) -> List[StockTrendResponse]:
+    """
+    Seyrek gün sonu satırlarını [start_date, end_date] aralığında günlük
+    seriye açar; satırı olmayan günler bir önceki günün değerini taşır.
+    Aralık başlangıcından önce satır yoksa ilk satıra kadarki günler
+    leading_state ile doldurulur.
+    """
+    state = leading_state
+    by_date = {s.snapshot_date: (s.quantity, s.reserved, s.available) for s in snapshots}
+    for snapshot in snapshots:
+        if snapshot.snapshot_date < start_date:
+            state = by_date[snapshot.snapshot_date]
+
+    trend = []
+    day = start_date
+    while day <= end_date:
+        state = by_date.get(day, state)
+        quantity, reserved, available = state
+        trend.append(StockTrendResponse(
+            date=datetime.combine(day, datetime.min.time()),
+            quantity=quantity,
+            reserved=reserved,
+            available=available
+        ))
+        day += timedelta(days=1)
+    return trend
+
+
+class StockSnapshotJob:
+    """
+    Gün sonu tablosunun bakım işi. Stok hareketleri satırları anlık yazar;
+    bu iş API dışındaki değişiklikleri (ör. veri aktarımları) yakalamak için
+    tüm malzemelerin günlük durumunu yazar ve geçmiş hareketlerden eksik
+    günleri geriye doğru doldurur.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncInventoryRepository(db)
+
+    async def capture(self, snapshot_date: Optional[date] = None) -> int:
+        snapshot_date = snapshot_date or today()
+        count = await self.repository.capture_daily_snapshots(snapshot_date)
+        await self.repository.db.commit()
+        logger.info(f"Captured {count} stock snapshots for {snapshot_date}")
+        return count
+
+    async def backfill(self, days: int) -> int:
+        """
+        Son days gün için hareket geçmişinden gün sonu durumlarını üretir.
+        Mevcut durumdan başlayıp hareketler yeniden eskiye geri alınır; her
+        günün son hareketinden sonraki durum o günün satırı olur.
+
+        Yalnızca satırı olmayan günler doldurulur; anlık yazılmış satırlar
+        korunur. Kısıt: PUT ile yapılan miktar/rezerv değişiklikleri hareket
+        kaydı üretmediğinden geri alınamaz; bu değişikliklerden önceki
+        günler için üretilen değerler yanlış olabilir.
+        """
+        end = datetime.utcnow()
+        start = end - timedelta(days=days)
+        written = 0
+        for material_id in await self.repository.get_materials_with_history(start):
+            material_stock = await self.repository.get_by_material_id(material_id)
+            if material_stock is None:
+                continue
+            movements = await self.repository.get_stock_history(
+                material_id, start, end, descending=True)
+            rows = self._rows_from_movements(material_stock, movements)
+            written += await self.repository.insert_missing_daily_snapshots(rows)
+            await self.repository.db.commit()
+        logger.info(f"Backfilled {written} stock snapshots over {days} days")
+        return written
+
+    @staticmethod
+    def _rows_from_movements(
+        material_stock: MaterialStock,
+        movements: List[StockHistory]
+    ) -> List[Dict[str, Any]]:
+        quantity, reserved = material_stock.quantity, material_stock.reserved or 0
+        rows: Dict[date, Dict[str, Any]] = {}
+        for movement in movements:
+            day = _utc_date(movement.created_at)
+            # Azalan sırada günün ilk görülen hareketi, günün son hareketidir
+            if day not in rows:
+                rows[day] = {
+                    "material_id": material_stock.material_id,
+                    "snapshot_date": day,
+                    "quantity": quantity,
+                    "reserved": reserved,
+                    "available": quantity - reserved
+                }
+            if movement.is_reserved:
+                reserved = movement.previous_quantity
+            else:
+                quantity = movement.previous_quantity
+        return list(rows.values())
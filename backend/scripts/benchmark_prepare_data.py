@@ -0,0 +1,119 @@
+"""
+prepare_and_save_data içindeki malzeme ayrıştırma adımı için benchmark.
+
+Üretim yolunu (tek geçişli build_long_format + save_prepared_store ile
+Arrow deposunun diske yazılması) sentetik veri üzerinde ölçer. --legacy
+verilirse eski malzeme başına boolean maske döngüsü (O(malzeme x satır))
+de tüm boyutlarda çalıştırılır ve yazılan depo onunla karşılaştırılır;
+eski döngü büyük boyutlarda dakikalar sürebilir.
+
+Kullanım:
+    python scripts/benchmark_prepare_data.py --materials 1000 5000 10000 20000 --legacy
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import build_long_format, save_prepared_store, SERIES_START, SERIES_FREQ
+
+
+def make_synthetic_data(n_materials: int, rows_per_material: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    materials = np.array([f"MAT{i}" for i in range(n_materials)])
+    df = pd.DataFrame({
+        # Satırlar gerçek dışa aktarımlardaki gibi malzemelere karışık dağılır
+        "MATERIAL": rng.permutation(np.repeat(materials, rows_per_material)),
+        "STOCK_QUANTITY": rng.gamma(2.0, 50.0, n_materials * rows_per_material)
+    })
+    stats = df.groupby("MATERIAL")["STOCK_QUANTITY"].agg([
+        "count", "mean", "std", "min", "max", "var"
+    ]).reset_index()
+    return df, stats
+
+
+def legacy_build_prepared_data(df: pd.DataFrame, stats: pd.DataFrame) -> dict:
+    """Değişiklik öncesi döngü (karşılaştırma için birebir kopya)"""
+    prepared_data = {}
+    for idx, row in stats.iterrows():
+        material_id = row["MATERIAL"]
+        material_df = df[df["MATERIAL"] == material_id].copy()
+
+        material_df["ds"] = pd.date_range(
+            start=SERIES_START,
+            periods=len(material_df),
+            freq=SERIES_FREQ
+        )
+        material_df["y"] = material_df["STOCK_QUANTITY"]
+
+        prepared_data[material_id] = {
+            "data": material_df[["ds", "y"]].sort_values("ds"),
+            "stats": row.to_dict()
+        }
+    return prepared_data
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def build_and_save_store(df: pd.DataFrame, stats: pd.DataFrame, directory: Path):
+    """prepare_and_save_data'daki üretim adımları"""
+    long_df, offsets = build_long_format(df, stats["MATERIAL"])
+    return save_prepared_store(long_df, offsets, stats, "benchmark", directory)
+
+
+def load_store_series(manifest_file: Path) -> dict:
+    """Yazılan depodaki serileri malzeme başına okur"""
+    import pyarrow as pa
+
+    manifest = pd.read_feather(manifest_file)
+    series_file = manifest_file.with_name("prepared_series_benchmark.arrow")
+    series = pa.ipc.open_file(pa.memory_map(str(series_file), "r")).read_all()
+    return {
+        row.MATERIAL: series.slice(int(row.start), int(row.stop - row.start)).select(["ds", "y"]).to_pandas()
+        for row in manifest.itertuples()
+    }
+
+
+def check_equivalent(legacy: dict, current: dict) -> None:
+    assert list(legacy) == list(current), "Material order differs"
+    for material_id in legacy:
+        expected = legacy[material_id]["data"].reset_index(drop=True)
+        actual = current[material_id].reset_index(drop=True)
+        pd.testing.assert_frame_equal(expected, actual, check_freq=False, check_dtype=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, nargs="+",
+                        default=[1000, 5000, 10000, 20000])
+    parser.add_argument("--rows-per-material", type=int, default=40)
+    parser.add_argument("--legacy", action="store_true",
+                        help="Also run the legacy per-material loop for every size and compare")
+    args = parser.parse_args()
+
+    print(f"{'materials':>10} {'rows':>10} {'legacy_s':>10} {'store_s':>10} {'speedup':>8}")
+    for n_materials in args.materials:
+        df, stats = make_synthetic_data(n_materials, args.rows_per_material)
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest_file, current_s = timed(build_and_save_store, df, stats, Path(tmp))
+
+            if args.legacy:
+                legacy, legacy_s = timed(legacy_build_prepared_data, df, stats)
+                check_equivalent(legacy, load_store_series(manifest_file))
+                speedup = f"{legacy_s / current_s:7.1f}x"
+                legacy_col = f"{legacy_s:10.2f}"
+            else:
+                legacy_col, speedup = f"{'-':>10}", f"{'-':>8}"
+
+        print(f"{n_materials:>10} {len(df):>10} {legacy_col} {current_s:10.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Stok listesi yanıt yolları için benchmark.
+
+Mevcut yol: ORM nesneleri -> MaterialStockRead (from_attributes) doğrulaması
+-> JSON (FastAPI response_model davranışı). Hafif yol: sütun sorgusu ->
+demetler -> orjson. Her iki yol aynı sorguyu (düşük stok listesi ve 1000'lik
+liste sayfası) ayrı veritabanında sentetik kayıtlarla çalıştırır.
+
+Kullanım (backend dizininden):
+    python -m scripts.benchmark_stock_serialization --rows 1000 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.inventory import MaterialStock, MaterialStockRead
+from app.repositories.inventory import AsyncInventoryRepository
+from app.services.inventory_rows import dumps, dumps_ndjson, rows_to_records
+
+PAGE_SIZE = 1000
+ALL_ROWS = float("inf")
+READ_LIST = TypeAdapter(List[MaterialStockRead])
+
+
+def render_orm(stocks: List[MaterialStock]) -> bytes:
+    """FastAPI 0.109 serialize_response + JSONResponse.render eşdeğeri"""
+    validated = READ_LIST.validate_python(stocks, from_attributes=True)
+    content = READ_LIST.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+async def seed(session_factory, rows: int) -> None:
+    async with session_factory() as db:
+        for start in range(0, rows, 10_000):
+            await db.execute(insert(MaterialStock), [
+                {"material_id": f"MAT{i:08d}", "material_description": f"Material {i}",
+                 "quantity": float(i % 500), "reserved": float(i % 7),
+                 "available": float(i % 500 - i % 7), "reorder_point": 50.0}
+                for i in range(start, min(start + 10_000, rows))
+            ])
+        await db.commit()
+
+
+async def measure(session_factory, func: Callable[[AsyncSession], Awaitable[bytes]],
+                  repeat: int) -> Tuple[float, bytes]:
+    """Her tekrar yeni oturumla çalışır; kimlik haritası önbelleği ölçümü bozmaz"""
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            body = await func(db)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+async def orm_low_stock(db: AsyncSession) -> bytes:
+    return render_orm(await AsyncInventoryRepository(db).get_low_stock_materials(ALL_ROWS))
+
+
+async def lean_low_stock(db: AsyncSession) -> bytes:
+    rows = []
+    async for batch in AsyncInventoryRepository(db).stream_low_stock_rows(ALL_ROWS):
+        rows.extend(batch)
+    return dumps(rows_to_records(rows))
+
+
+async def lean_low_stock_ndjson(db: AsyncSession) -> bytes:
+    chunks = []
+    async for batch in AsyncInventoryRepository(db).stream_low_stock_rows(ALL_ROWS):
+        chunks.append(dumps_ndjson(batch))
+    return b"".join(chunks)
+
+
+async def orm_page(db: AsyncSession) -> bytes:
+    return render_orm(await AsyncInventoryRepository(db).list_stocks(0, PAGE_SIZE))
+
+
+async def lean_page(db: AsyncSession) -> bytes:
+    return dumps(rows_to_records(await AsyncInventoryRepository(db).list_stock_rows(PAGE_SIZE)))
+
+
+def check_equivalent(orm_body: bytes, lean_body: bytes) -> None:
+    """Zaman damgası biçimi (Z / +00:00) dışında içerik aynı olmalı"""
+    def strip(items):
+        return [{k: v for k, v in item.items() if k not in ("created_at", "updated_at")}
+                for item in items]
+    assert strip(json.loads(orm_body)) == strip(orjson.loads(lean_body))
+
+
+async def run(row_counts: List[int], repeat: int, database_url: str) -> None:
+    print(f"{'rows':>8} {'query':>10} {'orm_ms':>9} {'lean_ms':>9} {'ndjson_ms':>9} "
+          f"{'speedup':>8} {'bytes':>11}")
+    for rows in row_counts:
+        engine = create_async_engine(database_url)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(MaterialStock.__table__.drop, checkfirst=True)
+            await conn.run_sync(MaterialStock.__table__.create)
+        await seed(session_factory, rows)
+
+        cases = [
+            ("low-stock", orm_low_stock, lean_low_stock, lean_low_stock_ndjson),
+            ("page", orm_page, lean_page, None),
+        ]
+        for name, orm_func, lean_func, ndjson_func in cases:
+            orm_s, orm_body = await measure(session_factory, orm_func, repeat)
+            lean_s, lean_body = await measure(session_factory, lean_func, repeat)
+            check_equivalent(orm_body, lean_body)
+            ndjson_col = f"{'-':>9}"
+            if ndjson_func is not None:
+                ndjson_s, _ = await measure(session_factory, ndjson_func, repeat)
+                ndjson_col = f"{ndjson_s * 1000:9.1f}"
+            print(f"{rows:>8} {name:>10} {orm_s * 1000:9.1f} {lean_s * 1000:9.1f} {ndjson_col} "
+                  f"{orm_s / lean_s:7.1f}x {len(lean_body):>11}")
+
+        async with engine.begin() as conn:
+            await conn.run_sync(MaterialStock.__table__.drop)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None,
+                        help="Async URL of a scratch database (material_stocks is dropped); "
+                             "defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(run(args.rows, args.repeat, args.database_url))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        asyncio.run(run(args.rows, args.repeat, url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Gün sonu stok tablosu (stock_daily_snapshots) bakım işi.
+
+Tüm malzemelerin bugünkü durumunu yazar; --backfill-days verilirse son N
+günün eksik satırlarını hareket geçmişinden üretir. Günlük zamanlanmış
+görev olarak backend dizininden çalıştırılır:
+
+    python -m scripts.compact_stock_snapshots --backfill-days 365
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.base import AsyncSessionLocal, async_engine
+from app.services.stock_snapshots import StockSnapshotJob
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(backfill_days: int) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            job = StockSnapshotJob(db)
+            if backfill_days:
+                await job.backfill(backfill_days)
+            await job.capture()
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backfill-days", type=int, default=0,
+                        help="Fill missing snapshots from stock history for the last N days")
+    args = parser.parse_args()
+    asyncio.run(run(args.backfill_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import logging
 from datetime import datetime
 import joblib
 import gc
+import argparse
+import hashlib
+import json
 
 # Logger ayarları
 logging.basicConfig(
@@ -18,13 +21,183 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_DIR = BASE_DIR / "output"
 PREPARED_DATA_DIR = OUTPUT_DIR / "prepared_data"
+CACHE_DIR = OUTPUT_DIR / "cache"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_excel_files():
+# Pipeline'ın kullandığı sütunlar ve tipleri (kaynak başlık isimleriyle)
+SOURCE_COLUMNS = {
+    "ORDERS": {"ORDER_NUMBER": "string", "MATERIAL_NUMBER": "string"},
+    "DELIVERY": {"ORDER": "string", "MATERIAL": "string"},
+    "STOCK": {"MATERIAL": "string", "STOCK_QUANTITY": "float64"},
+    "OPEN_ORDERS": {"ORDER_NUMBER": "string", "MATERIAL_NUMBER": "string", "ORDER_QUANTITY": "float64"},
+    "MATERIAL_LIST": {"MATERIAL_NUMBER": "string", "DESCRIPTION": "string"},
+}
+
+STREAM_CHUNK_ROWS = 100_000
+
+
+def _normalize_header(value):
+    return str(value).upper().strip() if value is not None else None
+
+
+def _typed_frame(records, columns, dtypes):
+    """
+    Satır listesini verilen tiplerle DataFrame'e çevirir.
+    Sayısal sütunlardaki geçersiz değerler NaN olur.
+    """
+    df = pd.DataFrame.from_records(records, columns=columns)
+    for column, dtype in dtypes.items():
+        if dtype == "float64":
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        else:
+            # Excel'in sayı olarak sakladığı ID'ler (ör. 160930.0) string'e çevrilir
+            df[column] = df[column].map(
+                lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else v
+            ).astype(dtype)
+    return df
+
+
+def iter_excel_chunks(path, dtypes, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Excel dosyasını openpyxl read-only modunda satır satır okur ve yalnızca
+    istenen sütunları içeren, tipleri belirlenmiş parçalar üretir.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize_header(value) for value in next(rows, ())]
+        missing = [column for column in dtypes if column not in header]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in {path.name}")
+        indices = [header.index(column) for column in dtypes]
+        columns = list(dtypes)
+
+        records = []
+        for row in rows:
+            records.append(tuple(row[i] if i < len(row) else None for i in indices))
+            if len(records) >= chunk_rows:
+                yield _typed_frame(records, columns, dtypes)
+                records = []
+        if records:
+            yield _typed_frame(records, columns, dtypes)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, dtypes, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    CSV dosyasını parça parça okur; yalnızca istenen sütunlar ayrıştırılır.
+    """
+    reader = pd.read_csv(
+        path,
+        usecols=lambda column: _normalize_header(column) in dtypes,
+        dtype={column: "string" for column in dtypes},
+        chunksize=chunk_rows
+    )
+    for chunk in reader:
+        chunk.columns = [_normalize_header(column) for column in chunk.columns]
+        yield _typed_frame(chunk[list(dtypes)].itertuples(index=False, name=None), list(dtypes), dtypes)
+
+
+def load_source_streaming(path, dtypes, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Kaynağı parça parça okuyup yalnızca projekte edilmiş sütunlarla birleştirir.
+    Bellekte aynı anda en fazla bir ham parça ve projekte edilmiş sonuç bulunur.
+    """
+    iterator = iter_csv_chunks if path.suffix.lower() == ".csv" else iter_excel_chunks
+    chunks = []
+    total_rows = 0
+    for chunk in iterator(path, dtypes, chunk_rows):
+        chunks.append(chunk)
+        total_rows += len(chunk)
+        logger.info(f"Read {total_rows} rows from {path.name}")
+    if not chunks:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _resolve_source_path(path):
+    """Aynı isimli CSV dışa aktarımı varsa Excel yerine onu tercih eder"""
+    csv_path = path.with_suffix(".csv")
+    return csv_path if csv_path.exists() else path
+
+
+def _source_cache_key(path, dtypes):
+    """
+    Önbellek anahtarı: dosyanın boyutu, mtime'ı, içerik özeti ve sütun projeksiyonu.
+    mtime/boyut değişmediyse içerik özeti yan dosyadan okunur, dosya tekrar hashlenmez.
+    """
+    stat = path.stat()
+    fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+    sidecar = CACHE_DIR / f"{path.name}.hash.json"
+
+    content_hash = None
+    if sidecar.exists():
+        cached = json.loads(sidecar.read_text())
+        if cached.get("fingerprint") == fingerprint:
+            content_hash = cached["sha256"]
+    if content_hash is None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        sidecar.write_text(json.dumps(
+            {"fingerprint": fingerprint, "sha256": content_hash}))
+
+    projection = json.dumps(dtypes, sort_keys=True)
+    return hashlib.sha256(f"{content_hash}:{projection}".encode()).hexdigest()[:16]
+
+
+def read_cached_table(cache_file):
+    """
+    Önbellekteki Feather dosyasını bellek eşlemli (memory-mapped) Arrow tablosu
+    olarak açar; sayısal sütunlar kopyalanmadan okunabilir.
+    """
+    from pyarrow import feather
+    return feather.read_table(cache_file, memory_map=True)
+
+
+def load_source_cached(name, path, dtypes):
+    """
+    Kaynağı tipli sütunsal önbellekten (Feather) yükler; önbellek yoksa ya da
+    kaynak değiştiyse kaynağı akışla okuyup önbelleği yeniler.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow is not installed; columnar cache disabled")
+        return load_source_streaming(path, dtypes)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    key = _source_cache_key(path, dtypes)
+    cache_file = CACHE_DIR / f"{name}_{key}.feather"
+
+    if cache_file.exists():
+        logger.info(f"Loading {name} from columnar cache {cache_file.name}")
+        return read_cached_table(cache_file).to_pandas()
+
+    df = load_source_streaming(path, dtypes)
+    # Bellek eşleme için sıkıştırmasız yazılır
+    df.to_feather(cache_file, compression="uncompressed")
+    for stale in CACHE_DIR.glob(f"{name}_*.feather"):
+        if stale != cache_file:
+            stale.unlink()
+    logger.info(f"Cached {name} to {cache_file.name}")
+    return df
+
+
+def load_excel_files(streaming=True, use_cache=True):
     """
     Excel dosyalarını yükler.
+    streaming=True iken dosyalar parça parça okunur ve yalnızca
+    SOURCE_COLUMNS içindeki sütunlar belirtilen tiplerle tutulur.
+    use_cache=True iken bu tipli sonuç kaynak dosyanın içeriğine göre
+    Feather olarak önbelleğe alınır ve sonraki çalıştırmalarda oradan okunur.
     """
     file_paths = {
         "ORDERS": DATA_DIR / "ORDERS.XLSX",
@@ -37,8 +210,14 @@ def load_excel_files():
     dataframes = {}
     for name, path in file_paths.items():
         try:
+            path = _resolve_source_path(path)
             logger.info(f"Loading {name} from {path}")
-            df = pd.read_excel(path)
+            if streaming and use_cache:
+                df = load_source_cached(name, path, SOURCE_COLUMNS[name])
+            elif streaming:
+                df = load_source_streaming(path, SOURCE_COLUMNS[name])
+            else:
+                df = pd.read_excel(path)
             dataframes[name] = df
             logger.info(f"Successfully loaded {name} with {len(df)} rows")
         except Exception as e:
@@ -114,6 +293,82 @@ def combine_dataframes(dataframes):
         raise
 
 
+SERIES_START = "2024-01-01"
+SERIES_FREQ = "W"
+
+
+def build_long_format(df: pd.DataFrame, materials) -> tuple:
+    """
+    Seçili malzemelerin satırlarını tek geçişte (ds, y) uzun formatına çevirir.
+    Satırlar malzemeye göre kararlı sıralanır; her malzemenin satırları
+    offsets tablosundaki [start, stop) aralığındadır.
+    """
+    long_df = df.loc[df["MATERIAL"].isin(materials), ["MATERIAL", "STOCK_QUANTITY"]]
+    long_df = long_df.sort_values("MATERIAL", kind="stable").reset_index(drop=True)
+
+    # Malzeme içindeki sıra, eski döngüdeki pd.date_range(periods=len) ile aynı tarihleri verir
+    first_date = pd.date_range(start=SERIES_START, periods=1, freq=SERIES_FREQ)[0]
+    position = long_df.groupby("MATERIAL", sort=False).cumcount().to_numpy()
+    long_df["ds"] = first_date + pd.to_timedelta(position * 7, unit="D")
+    long_df = long_df.rename(columns={"STOCK_QUANTITY": "y"})[["MATERIAL", "ds", "y"]]
+
+    material_values = long_df["MATERIAL"].to_numpy()
+    if len(material_values):
+        starts = np.flatnonzero(np.r_[True, material_values[1:] != material_values[:-1]])
+    else:
+        starts = np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(material_values)].astype(int)
+    offsets = pd.DataFrame({
+        "MATERIAL": material_values[starts],
+        "start": starts,
+        "stop": stops
+    })
+    return long_df, offsets
+
+
+def build_prepared_data(df: pd.DataFrame, stats: pd.DataFrame) -> dict:
+    """
+    Malzeme başına (ds, y) serilerini ve istatistiklerini içeren sözlüğü
+    tek sıralama geçişiyle oluşturur (malzeme x satır maskeleri yerine).
+    """
+    long_df, offsets = build_long_format(df, stats["MATERIAL"])
+    bounds = dict(zip(offsets["MATERIAL"], zip(offsets["start"], offsets["stop"])))
+    series = long_df[["ds", "y"]]
+
+    prepared_data = {}
+    for row in stats.to_dict(orient="records"):
+        start, stop = bounds[row["MATERIAL"]]
+        prepared_data[row["MATERIAL"]] = {
+            "data": series.iloc[start:stop],
+            "stats": row
+        }
+    return prepared_data
+
+
+def save_prepared_store(long_df: pd.DataFrame, offsets: pd.DataFrame, stats: pd.DataFrame, timestamp: str,
+                        directory: Path = PREPARED_DATA_DIR):
+    """
+    Hazırlanmış seriyi indeksli sütunsal depo olarak yazar:
+    malzemeye göre sıralı tek bir Arrow IPC dosyası ve her malzemenin
+    istatistikleri ile satır aralığını tutan manifest. Manifest en son
+    yazılır; okuyucular yarım yazılmış bir depoyu görmez.
+    """
+    import pyarrow as pa
+
+    series_file = directory / f"prepared_series_{timestamp}.arrow"
+    table = pa.Table.from_pandas(long_df, preserve_index=False)
+    # Bellek eşleme ile dilim okunabilmesi için sıkıştırmasız yazılır
+    with pa.OSFile(str(series_file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    manifest = stats.merge(offsets, on="MATERIAL", how="left")
+    manifest["MATERIAL"] = manifest["MATERIAL"].astype(str)
+    manifest_file = directory / f"prepared_manifest_{timestamp}.feather"
+    manifest.reset_index(drop=True).to_feather(manifest_file)
+    return manifest_file
+
+
 def prepare_and_save_data(combined_df: pd.DataFrame):
     try:
         logger.info("Starting data preparation process...")
@@ -181,24 +436,9 @@ def prepare_and_save_data(combined_df: pd.DataFrame):
         logger.info(f"Filtered data shape: {df.shape}")
 
         # Hazırlanmış veriyi oluştur
-        prepared_data = {}
-        for idx, row in stats.iterrows():
-            material_id = row["MATERIAL"]
-            material_df = df[df["MATERIAL"] == material_id].copy()
-
-            material_df["ds"] = pd.date_range(
-                start="2024-01-01",
-                periods=len(material_df),
-                freq="W"
-            )
-            material_df["y"] = material_df["STOCK_QUANTITY"]
-
-            prepared_data[material_id] = {
-                "data": material_df[["ds", "y"]].sort_values("ds"),
-                "stats": row.to_dict()
-            }
+        long_df, offsets = build_long_format(df, stats["MATERIAL"])
 
-        logger.info(f"Prepared data for {len(prepared_data)} materials")
+        logger.info(f"Prepared data for {len(offsets)} materials")
 
         # Verileri kaydet
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -207,10 +447,24 @@ def prepare_and_save_data(combined_df: pd.DataFrame):
         output_file = OUTPUT_DIR / "cleaned_data.csv"
         combined_df.to_csv(output_file, index=False)
         logger.info(f"Saved cleaned data to: {output_file}")
+        try:
+            columnar_file = OUTPUT_DIR / "cleaned_data.feather"
+            combined_df.reset_index(drop=True).to_feather(
+                columnar_file, compression="uncompressed")
+            logger.info(f"Saved columnar cleaned data to: {columnar_file}")
+        except Exception as e:
+            # pyarrow yoksa ya da karışık tipli sütun varsa CSV yeterli
+            logger.warning(f"Skipping cleaned_data.feather: {e}")
 
         # Hazırlanmış veriyi kaydet
-        prepared_file = PREPARED_DATA_DIR / f"prepared_data_{timestamp}.pkl"
-        joblib.dump(prepared_data, prepared_file)
+        try:
+            prepared_file = save_prepared_store(long_df, offsets, stats, timestamp)
+        except ImportError:
+            logger.warning(
+                "pyarrow is not installed; falling back to a monolithic pickle")
+            prepared_data = build_prepared_data(df, stats)
+            prepared_file = PREPARED_DATA_DIR / f"prepared_data_{timestamp}.pkl"
+            joblib.dump(prepared_data, prepared_file)
         logger.info(f"Saved prepared data to: {prepared_file}")
 
         # İstatistikleri kaydet
@@ -231,10 +485,26 @@ def prepare_and_save_data(combined_df: pd.DataFrame):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SAP data cleaning pipeline")
+    parser.add_argument(
+        "--no-streaming",
+        action="store_true",
+        help="Load whole workbooks with pandas.read_excel instead of streaming"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the columnar (Feather) cache of source extracts"
+    )
+    args = parser.parse_args()
+
     try:
         # Excel dosyalarını yükle ve birleştir
         logger.info("Starting data processing...")
-        dataframes = load_excel_files()
+        dataframes = load_excel_files(
+            streaming=not args.no_streaming,
+            use_cache=not args.no_cache
+        )
         clean_dfs = clean_and_standardize_dataframes(dataframes)
         combined_df = combine_dataframes(clean_dfs)
 
@@ -0,0 +1,51 @@
+"""
+stock_history aylık bölüm bakımı (PostgreSQL).
+
+Önümüzdeki aylar için bölüm oluşturur, saklama süresini aşan bölümleri
+output/archive/stock_history altına zstd sıkıştırmalı Parquet olarak
+arşivleyip siler. Günlük zamanlanmış görev olarak backend dizininden:
+
+    python -m scripts.maintain_stock_history --retention-months 24
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.base import AsyncSessionLocal, async_engine
+from app.services.stock_history_partitions import StockHistoryPartitionManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(retention_months, skip_archive: bool) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            manager = StockHistoryPartitionManager(db)
+            if not manager.enabled:
+                logger.warning("stock_history is only partitioned on PostgreSQL; nothing to do")
+                return
+            created = await manager.ensure_partitions()
+            logger.info(f"Partitions in place: {', '.join(created)}")
+            if not skip_archive:
+                archived = await manager.archive_partitions(retention_months)
+                logger.info(f"Archived {len(archived)} partitions")
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--retention-months", type=int, default=None,
+                        help="Keep this many months in the database (default: settings)")
+    parser.add_argument("--skip-archive", action="store_true",
+                        help="Only create upcoming partitions")
+    args = parser.parse_args()
+    asyncio.run(run(args.retention_months, args.skip_archive))
+
+
+if __name__ == "__main__":
+    main()
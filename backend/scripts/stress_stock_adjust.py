@@ -0,0 +1,121 @@
+"""
+Eşzamanlı stok hareketleri için kayıp güncelleme testi.
+
+Geçici bir malzeme oluşturur, --workers eşzamanlı işçiden her biri kendi
+oturumuyla --adjustments kez AsyncInventoryService.adjust_stock çağırır.
+Sonunda stok miktarı başlangıç + başarılı hareketlerin toplamına, hareket
+kaydı sayısı da başarılı hareket sayısına eşit olmalıdır. --legacy eski
+okuma-hesaplama-yazma yolunu çalıştırarak kaybolan güncellemeleri gösterir.
+
+Anlamlı sonuç için PostgreSQL üzerinde, backend dizininden çalıştırın:
+
+    python -m scripts.stress_stock_adjust --workers 64 --adjustments 200
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from typing import Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.db.base import AsyncSessionLocal, async_engine
+from app.models.inventory import MaterialStock, MaterialStockCreate, StockHistory
+from app.services.inventory import AsyncInventoryService, _apply_adjustment
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+INITIAL_QUANTITY = 1_000_000.0
+
+
+async def legacy_adjust(material_id: str, quantity_change: float) -> None:
+    """Değişiklik öncesi yol: satırı oku, Python'da hesapla, geri yaz"""
+    async with AsyncSessionLocal() as db:
+        stock = (await db.execute(
+            select(MaterialStock).where(MaterialStock.material_id == material_id)
+        )).scalars().one()
+        _apply_adjustment(stock, quantity_change, False)
+        await db.commit()
+
+
+async def worker(material_id: str, adjustments: int, legacy: bool, seed: int) -> Tuple[float, int]:
+    """(uygulanan toplam değişim, başarılı hareket sayısı)"""
+    rng = random.Random(seed)
+    applied, succeeded = 0.0, 0
+    for _ in range(adjustments):
+        change = float(rng.choice([-3, -2, -1, 1, 2, 3]))
+        if legacy:
+            await legacy_adjust(material_id, change)
+        else:
+            async with AsyncSessionLocal() as db:
+                try:
+                    await AsyncInventoryService(db).adjust_stock(material_id, change, notes="stress")
+                except HTTPException:
+                    continue
+        applied += change
+        succeeded += 1
+    return applied, succeeded
+
+
+async def run(workers: int, adjustments: int, legacy: bool) -> bool:
+    material_id = f"STRESS-{uuid.uuid4().hex[:8]}"
+    async with AsyncSessionLocal() as db:
+        await AsyncInventoryService(db).create_material_stock(MaterialStockCreate(
+            material_id=material_id, quantity=INITIAL_QUANTITY))
+
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            worker(material_id, adjustments, legacy, seed) for seed in range(workers)))
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSessionLocal() as db:
+            stock = (await db.execute(
+                select(MaterialStock).where(MaterialStock.material_id == material_id)
+            )).scalars().one()
+            history_rows = await db.scalar(
+                select(func.count()).select_from(StockHistory).where(
+                    StockHistory.material_id == material_id))
+
+        expected = INITIAL_QUANTITY + sum(applied for applied, _ in results)
+        succeeded = sum(count for _, count in results)
+        total = workers * adjustments
+        print(f"mode={'legacy' if legacy else 'atomic'} workers={workers} adjustments={total} "
+              f"elapsed={elapsed:.2f}s ({total / elapsed:.0f}/s)")
+        print(f"expected_quantity={expected} actual_quantity={stock.quantity} "
+              f"available={stock.available} history_rows={history_rows}")
+        ok = stock.quantity == expected and stock.available == stock.quantity - stock.reserved
+        if not legacy:
+            ok = ok and history_rows == succeeded
+        print("OK: no lost updates" if ok else
+              f"FAIL: {expected - stock.quantity:+} quantity lost")
+        return ok
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(StockHistory).where(StockHistory.material_id == material_id))
+            await db.execute(delete(MaterialStock).where(MaterialStock.material_id == material_id))
+            await db.commit()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--adjustments", type=int, default=100,
+                        help="Adjustments per worker")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Use the old read-modify-write path to demonstrate lost updates")
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.workers, args.adjustments, args.legacy))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()